@@ -0,0 +1,614 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+
+#------------------------------------------------------------------------------#
+# Benchmarks of the Bayes classifier                                           #
+# ============================================================================ #
+# Organization: HE-Arc Engineering                                             #
+# Developer(s): Danick Fort                                                    #
+#               Dany Jupille                                                   #
+#                                                                              #
+# Filename:     benchmark.py                                                   #
+# Description:  Reproducible benchmarks of the classifier module. Synthetic    #
+#               content is generated from a seed, so two runs of the same      #
+#               version measure the same work.                                 #
+# Version:      1.0                                                            #
+#------------------------------------------------------------------------------#
+
+#------------------------------------------------------------------------------#
+#                                                                              #
+# ------------------------------ GLOBAL SECTION ------------------------------ #
+#                                                                              #
+#------------------------------------------------------------------------------#
+
+#------------------------------------------------------------------------------#
+#                                                                              #
+#                               LIBRARIES IMPORT                               #
+#                                                                              #
+#------------------------------------------------------------------------------#
+
+import argparse
+import json
+import os
+import platform
+import random
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from collections import Counter, defaultdict
+from itertools import accumulate
+from math import log
+
+from classifier import FEATURE_SELECTION_CHI_SQUARE, FEATURE_SELECTION_MUTUAL_INFORMATION, BayesClassifier, Tokenizer, generateFileIterator
+
+# The resource module only exists on Unix systems
+try:
+    import resource
+except ImportError:
+    resource = None
+
+#------------------------------------------------------------------------------#
+#                                                                              #
+#                             UTILITIES FUNCTIONS                              #
+#                                                                              #
+#------------------------------------------------------------------------------#
+
+def generateWords(vocabularySize, nbWords, seed = 0, skew = 1.0):
+    """
+    Generate random words following a Zipf law: the word of rank r is drawn
+    with a weight of 1 / r ** skew.
+
+    @param vocabularySize: the amount of different words.
+    @param nbWords: the amount of words to generate.
+    @param seed: the seed of the random generator (default is 0).
+    @param skew: the exponent of the Zipf law (default is 1.0).
+    @rtype: list
+    @return: the words.
+    """
+    generator = random.Random(seed)
+    words = ['mot{0}'.format(rank) for rank in range(vocabularySize)]
+    cumulativeWeights = list(accumulate(1.0 / (rank + 1) ** skew for rank in range(vocabularySize)))
+
+    return generator.choices(words, cum_weights = cumulativeWeights, k = nbWords)
+
+def benchmarkMemory(vocabularySize = 200000, nbWords = 2000000, nbClasses = 2, seed = 0):
+    """
+    Measure the memory allocated by a trained BayesClassifier, and by the same
+    training stored in the dictionaries layout of the version 1.0: for every
+    class, a dictionary of words occurrence and a dictionary of words
+    probability, plus a set of vocabulary words.
+
+    @param vocabularySize: the amount of different words (default is 200000).
+    @param nbWords: the amount of training words by class (default is 2000000).
+    @param nbClasses: the amount of classes (default is 2).
+    @param seed: the seed of the random generator (default is 0).
+    @rtype: dict
+    @return: the allocated bytes of both layouts, with the keys 'arrays',
+    'dictionaries' and 'vocabularySize'.
+    """
+    classesWordsCount = [Counter(generateWords(vocabularySize, nbWords, seed + i)) for i in range(nbClasses)]
+
+    tracemalloc.start()
+
+    classifier = BayesClassifier()
+
+    for i, wordsCount in enumerate(classesWordsCount):
+        classifier.addTrainingWordsCount(i, wordsCount)
+
+    classifier.doTraining()
+    arraysSize = tracemalloc.get_traced_memory()[0]
+
+    tracemalloc.stop()
+    tracemalloc.start()
+
+    vocabularyList = set()
+    wordsDictionaries = []
+
+    for wordsCount in classesWordsCount:
+        wordsDictionary = defaultdict(int)
+
+        for word, count in wordsCount.items():
+            wordsDictionary[word] += count
+            vocabularyList.add(word)
+
+        wordsDictionaries.append(wordsDictionary)
+
+    wordsDictionariesProbability = []
+
+    for wordsDictionary in wordsDictionaries:
+        nbClassWords = sum(wordsDictionary.values())
+        wordsDictionaryProbability = defaultdict(float)
+
+        for word in vocabularyList:
+            wordsDictionaryProbability[word] = log(float(wordsDictionary[word] + 1) / float(nbClassWords + len(vocabularyList)))
+
+        wordsDictionariesProbability.append(wordsDictionaryProbability)
+
+    dictionariesSize = tracemalloc.get_traced_memory()[0]
+
+    tracemalloc.stop()
+
+    return {
+        'vocabularySize': len(vocabularyList),
+        'arrays': arraysSize,
+        'dictionaries': dictionariesSize
+    }
+
+def generateCorpus(directory, nbDocumentsByClass = 200, nbWordsByDocument = 500, vocabularySize = 20000, nbClasses = 2, tagged = False, skew = 1.0, seed = 0):
+    """
+    Write a synthetic corpus: one sub-directory by class holding its
+    documents. Every class draws its words from the same Zipf law, but the
+    ranks of each class are shifted so that the classes can be told apart.
+
+    @param directory: the directory in which the corpus is written.
+    @param nbDocumentsByClass: the amount of documents by class (default is
+    200).
+    @param nbWordsByDocument: the amount of words by document (default is 500).
+    @param vocabularySize: the amount of different words (default is 20000).
+    @param nbClasses: the amount of classes (default is 2).
+    @param tagged: flag to tell if the documents are tagged or not (default is
+    False).
+    @param skew: the exponent of the Zipf law (default is 1.0).
+    @param seed: the seed of the random generator (default is 0).
+    @rtype: dict
+    @return: the documents file paths lists by class name.
+    """
+    filePathsByClass = {}
+
+    for i in range(nbClasses):
+        className = 'class{0}'.format(i)
+        classDirectory = os.path.join(directory, className)
+        os.makedirs(classDirectory, exist_ok = True)
+
+        # Shift the ranks by a few words, so the classes share most of their
+        # vocabulary but not their most frequent words
+        shift = i * 7
+        words = ['mot{0}'.format((int(word[3:]) + shift) % vocabularySize) for word in generateWords(vocabularySize, nbDocumentsByClass * nbWordsByDocument, seed + i, skew)]
+        filePaths = []
+
+        for j in range(nbDocumentsByClass):
+            filePath = os.path.join(classDirectory, 'document{0}.txt'.format(j))
+            writeText(filePath, words[j * nbWordsByDocument:(j + 1) * nbWordsByDocument], tagged, seed + j)
+            filePaths.append(filePath)
+
+        filePathsByClass[className] = filePaths
+
+    return filePathsByClass
+
+def getPeakRss():
+    """
+    Get the peak resident set size of this process since its start.
+
+    @rtype: int
+    @return: the peak resident set size in bytes, None if it cannot be
+    measured on this system.
+    """
+    if resource is None:
+        return None
+
+    peakRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kibibytes, macOS bytes
+    return peakRss if sys.platform == 'darwin' else peakRss * 1024
+
+def writeText(filePath, words, tagged, seed = 0):
+    """
+    Write words in a file, as an untagged text with punctuation and capitals,
+    or as a tagged text with one word by line in the TreeTagger format.
+
+    @param filePath: the file path of the file to write.
+    @param words: the words to write.
+    @param tagged: flag to tell if the file is tagged or not.
+    @param seed: the seed of the random generator (default is 0).
+    """
+    generator = random.Random(seed)
+
+    with open(filePath, 'w', encoding = 'utf-8') as file:
+        if tagged:
+            for word in words:
+                wordType = generator.choice(('NOM', 'VER:pres', 'ADJ', 'ADV', 'PUN', 'NAM'))
+                file.write('{0}\t{1}\t{2}\n'.format(word.capitalize(), wordType, word))
+        else:
+            for i in range(0, len(words), 12):
+                line = ' '.join(word.capitalize() if generator.random() < 0.1 else word for word in words[i:i + 12])
+                file.write(line + generator.choice(string.punctuation) + '\n')
+
+def generateFileIteratorVersion1(filePath, fileTagged, ignoreList = []):
+    """
+    The tokenizer of the version 1.0, kept as the reference of
+    benchmarkTokenizer.
+    """
+    if fileTagged:
+        with open(filePath, encoding = 'utf-8') as file:
+            for line in file:
+                wordInfo = line.strip().split()
+
+                if len(wordInfo) == 3:
+                    if wordInfo[2] not in ignoreList and \
+                       wordInfo[1] != 'PUN' and \
+                       wordInfo[1] != 'SENT' and \
+                       wordInfo[1] != 'NAM':
+                        yield wordInfo[2]
+    else:
+        with open(filePath, encoding = 'utf-8') as file:
+            noPunctuationTranstable = str.maketrans('', '', string.punctuation)
+
+            for line in file:
+                line = line.translate(noPunctuationTranstable)
+                words = line.strip().split()
+
+                for word in words:
+                    if word not in ignoreList:
+                        yield word.lower()
+
+def _measureTokensBySecond(tokenize):
+    """
+    Measure the tokens per second of a tokenizer run.
+
+    @param tokenize: the function running the tokenizer.
+    @rtype: float
+    @return: the tokens per second.
+    """
+    start = time.perf_counter()
+    nbTokens = len(tokenize())
+
+    return nbTokens / (time.perf_counter() - start)
+
+def benchmarkTokenizer(nbWords = 1000000, vocabularySize = 50000, nbRuns = 3, seed = 0):
+    """
+    Measure the tokens per second of the tokenizer of the version 1.0, of
+    generateFileIterator and of Tokenizer.tokenizeFile, on a tagged and an
+    untagged synthetic file.
+
+    @param nbWords: the amount of words of each file (default is 1000000).
+    @param vocabularySize: the amount of different words (default is 50000).
+    @param nbRuns: the amount of runs of each tokenizer, the best one is kept
+    (default is 3).
+    @param seed: the seed of the random generator (default is 0).
+    @rtype: dict
+    @return: the tokens per second by tokenizer, for the keys 'tagged' and
+    'untagged'.
+    """
+    words = generateWords(vocabularySize, nbWords, seed)
+    ignoreList = frozenset(words[:100])
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        for tagged in (True, False):
+            filePath = os.path.join(directory, 'text.txt')
+            writeText(filePath, words, tagged, seed)
+
+            tokenizers = {
+                'version1': lambda: list(generateFileIteratorVersion1(filePath, tagged, ignoreList)),
+                'generateFileIterator': lambda: list(generateFileIterator(filePath, tagged, ignoreList)),
+                'tokenizeFile': lambda: Tokenizer(tagged, ignoreList).tokenizeFile(filePath)
+            }
+
+            tokensBySecond = {}
+
+            for name, tokenize in tokenizers.items():
+                tokensBySecond[name] = max(_measureTokensBySecond(tokenize) for i in range(nbRuns))
+
+            results['tagged' if tagged else 'untagged'] = tokensBySecond
+
+    return results
+
+def benchmarkPipeline(nbDocumentsByClass = 200, nbWordsByDocument = 500, vocabularySize = 20000, nbClasses = 2, tagged = False, skew = 1.0, nbFolds = 10, useNumpy = False, seed = 0):
+    """
+    Time separately each stage of the classifier on a synthetic corpus:
+    addTrainingContent on every document, doTraining, classify on every
+    document and doCrossValidation. The peak resident set size is read after
+    each stage; as a process peak, it never decreases.
+
+    @param nbDocumentsByClass: the amount of documents by class (default is
+    200).
+    @param nbWordsByDocument: the amount of words by document (default is 500).
+    @param vocabularySize: the amount of different words (default is 20000).
+    @param nbClasses: the amount of classes (default is 2).
+    @param tagged: flag to tell if the documents are tagged or not (default is
+    False).
+    @param skew: the exponent of the Zipf law (default is 1.0).
+    @param nbFolds: the amount of cross-validation folds (default is 10).
+    @param useNumpy: flag to use the NumPy matrix engine (default is False).
+    @param seed: the seed of the random generator (default is 0).
+    @rtype: dict
+    @return: a dictionary with the keys 'parameters', 'stages' (time in
+    seconds and peak RSS in bytes by stage), 'nbDocuments',
+    'vocabularySize' and 'accuracy' (mean cross-validation accuracy).
+    """
+    parameters = {
+        'nbDocumentsByClass': nbDocumentsByClass,
+        'nbWordsByDocument': nbWordsByDocument,
+        'vocabularySize': vocabularySize,
+        'nbClasses': nbClasses,
+        'tagged': tagged,
+        'skew': skew,
+        'nbFolds': nbFolds,
+        'useNumpy': useNumpy,
+        'seed': seed
+    }
+    stages = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        filePathsByClass = generateCorpus(directory, nbDocumentsByClass, nbWordsByDocument, vocabularySize, nbClasses, tagged, skew, seed)
+        filePaths = [filePath for classFilePaths in filePathsByClass.values() for filePath in classFilePaths]
+
+        classifier = BayesClassifier(tagged, useNumpy)
+
+        start = time.perf_counter()
+
+        for className, classFilePaths in filePathsByClass.items():
+            for filePath in classFilePaths:
+                classifier.addTrainingContent(className, filePath)
+
+        stages['addTrainingContent'] = {'time': time.perf_counter() - start, 'peakRss': getPeakRss()}
+
+        start = time.perf_counter()
+        classifier.doTraining()
+        stages['doTraining'] = {'time': time.perf_counter() - start, 'peakRss': getPeakRss()}
+
+        start = time.perf_counter()
+
+        for filePath in filePaths:
+            classifier.classify(filePath)
+
+        stages['classify'] = {'time': time.perf_counter() - start, 'peakRss': getPeakRss()}
+
+        start = time.perf_counter()
+        folds = classifier.doCrossValidation(filePathsByClass, nbFolds)
+        stages['doCrossValidation'] = {'time': time.perf_counter() - start, 'peakRss': getPeakRss()}
+
+    return {
+        'parameters': parameters,
+        'stages': stages,
+        'nbDocuments': len(filePaths),
+        'vocabularySize': classifier.getVocabularySize(),
+        'accuracy': sum(fold['accuracy'] for fold in folds) / len(folds)
+    }
+
+# Pruning settings compared by benchmarkPruning, as setPruning arguments
+PRUNING_SETTINGS = [
+    {},
+    {'minWordCount': 2},
+    {'minWordCount': 5},
+    {'maxVocabularySize': 5000},
+    {'maxVocabularySize': 1000},
+    {'featureSelection': FEATURE_SELECTION_MUTUAL_INFORMATION, 'nbSelectedWords': 1000},
+    {'featureSelection': FEATURE_SELECTION_CHI_SQUARE, 'nbSelectedWords': 1000}
+]
+
+def benchmarkPruning(pruningSettings = PRUNING_SETTINGS, nbDocumentsByClass = 200, nbWordsByDocument = 500, vocabularySize = 20000, nbClasses = 2, tagged = False, skew = 1.0, nbFolds = 10, seed = 0):
+    """
+    Compare pruning settings on a synthetic corpus: the size of the model
+    trained on every document and compacted, against the mean
+    cross-validation accuracy.
+
+    @param pruningSettings: the list of setPruning arguments dictionaries
+    (default is PRUNING_SETTINGS).
+    @param nbDocumentsByClass: the amount of documents by class (default is
+    200).
+    @param nbWordsByDocument: the amount of words by document (default is 500).
+    @param vocabularySize: the amount of different words (default is 20000).
+    @param nbClasses: the amount of classes (default is 2).
+    @param tagged: flag to tell if the documents are tagged or not (default is
+    False).
+    @param skew: the exponent of the Zipf law (default is 1.0).
+    @param nbFolds: the amount of cross-validation folds (default is 10).
+    @param seed: the seed of the random generator (default is 0).
+    @rtype: list
+    @return: one dictionary by setting with the keys 'pruning' (the
+    setting), 'vocabularySize', 'modelSize' (in bytes), 'trainingTime' (in
+    seconds), 'accuracy', 'sizeReduction' and 'accuracyChange' (both against
+    the first setting).
+    """
+    results = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        filePathsByClass = generateCorpus(directory, nbDocumentsByClass, nbWordsByDocument, vocabularySize, nbClasses, tagged, skew, seed)
+        modelFilePath = os.path.join(directory, 'model.bin')
+
+        # Files are counted once, every setting trains from the same counts
+        tokenizer = Tokenizer(tagged)
+        filesWordsCount = {className: [Counter(tokenizer.tokenizeFile(filePath)) for filePath in filePaths] for className, filePaths in filePathsByClass.items()}
+
+        for pruning in pruningSettings:
+            classifier = BayesClassifier(tagged)
+            classifier.setPruning(**pruning)
+
+            for className, classFilesWordsCount in filesWordsCount.items():
+                for wordsCount in classFilesWordsCount:
+                    classifier.addTrainingWordsCount(className, wordsCount)
+
+            start = time.perf_counter()
+            classifier.doTraining()
+            classifier.compactVocabulary()
+            trainingTime = time.perf_counter() - start
+
+            classifier.save(modelFilePath)
+            folds = classifier.doCrossValidation(filePathsByClass, nbFolds)
+
+            results.append({
+                'pruning': pruning,
+                'vocabularySize': classifier.getVocabularySize(),
+                'modelSize': os.path.getsize(modelFilePath),
+                'trainingTime': trainingTime,
+                'accuracy': sum(fold['accuracy'] for fold in folds) / len(folds)
+            })
+
+    for result in results:
+        result['sizeReduction'] = 1.0 - float(result['modelSize']) / results[0]['modelSize']
+        result['accuracyChange'] = result['accuracy'] - results[0]['accuracy']
+
+    return results
+
+# Amounts of classes compared by benchmarkManyClasses
+MANY_CLASSES_COUNTS = [2, 10, 100, 500, 1000]
+
+# Scoring engines compared by benchmarkManyClasses, as BayesClassifier settings
+MANY_CLASSES_ENGINES = {
+    'python': {'useNumpy': False, 'manyClasses': False},
+    'numpy': {'useNumpy': True, 'manyClasses': False},
+    'manyClasses': {'useNumpy': True, 'manyClasses': True}
+}
+
+def benchmarkManyClasses(classesCounts = MANY_CLASSES_COUNTS, engines = MANY_CLASSES_ENGINES, nbDocumentsByClass = 5, nbWordsByDocument = 500, vocabularySize = 5000, nbTestDocuments = 100, nbTopClasses = 5, skew = 1.0, seed = 0):
+    """
+    Measure how the latency of a document grows with the amount of classes:
+    every document is scored alone by predictTopClassesWordsCountBatch, from
+    its words already counted, with every scoring engine.
+
+    @param classesCounts: the amounts of classes to compare (default is
+    MANY_CLASSES_COUNTS).
+    @param engines: the BayesClassifier settings by engine name (default is
+    MANY_CLASSES_ENGINES).
+    @param nbDocumentsByClass: the amount of training documents by class
+    (default is 5).
+    @param nbWordsByDocument: the amount of words by document (default is 500).
+    @param vocabularySize: the amount of different words (default is 5000).
+    @param nbTestDocuments: the amount of documents scored (default is 100).
+    @param nbTopClasses: the amount of classes asked by document (default is
+    5).
+    @param skew: the exponent of the Zipf law (default is 1.0).
+    @param seed: the seed of the random generator (default is 0).
+    @rtype: dict
+    @return: by engine name, one dictionary by amount of classes with the keys
+    'nbClasses', 'trainingTime' and 'latency' (in seconds), and 'growth' (the
+    latency against the one of the first amount of classes).
+    """
+    testWordsCounts = [Counter(generateWords(vocabularySize, nbWordsByDocument, seed + 10 ** 6 + i, skew)) for i in range(nbTestDocuments)]
+    trainingWordsCounts = []
+    results = {engine: [] for engine in engines}
+
+    for nbClasses in classesCounts:
+        # Documents of the classes already generated are kept
+        while len(trainingWordsCounts) < nbClasses * nbDocumentsByClass:
+            trainingWordsCounts.append(Counter(generateWords(vocabularySize, nbWordsByDocument, seed + len(trainingWordsCounts), skew)))
+
+        for engine, settings in engines.items():
+            classifier = BayesClassifier(useNumpy = settings['useNumpy'])
+            classifier.setManyClasses(settings['manyClasses'])
+
+            for i in range(nbClasses * nbDocumentsByClass):
+                classifier.addTrainingWordsCount('class{0}'.format(i % nbClasses), trainingWordsCounts[i])
+
+            start = time.perf_counter()
+            classifier.doTraining()
+            trainingTime = time.perf_counter() - start
+
+            start = time.perf_counter()
+
+            for wordsCount in testWordsCounts:
+                classifier.predictTopClassesWordsCountBatch([wordsCount], nbTopClasses)
+
+            results[engine].append({
+                'nbClasses': nbClasses,
+                'trainingTime': trainingTime,
+                'latency': (time.perf_counter() - start) / nbTestDocuments
+            })
+
+    for engineResults in results.values():
+        for result in engineResults:
+            result['growth'] = result['latency'] / engineResults[0]['latency']
+
+    return results
+
+#------------------------------------------------------------------------------#
+#                                                                              #
+# ------------------------------- MAIN SECTION ------------------------------- #
+#                                                                              #
+#------------------------------------------------------------------------------#
+
+# If this is the main module, run this
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Benchmark the Bayes classifier on synthetic content.')
+    parser.add_argument('--output', help = 'JSON file in which the results are written')
+    parser.add_argument('--documents', type = int, default = 200, help = 'documents by class')
+    parser.add_argument('--words', type = int, default = 500, help = 'words by document')
+    parser.add_argument('--vocabulary', type = int, default = 20000, help = 'different words')
+    parser.add_argument('--classes', type = int, default = 2)
+    parser.add_argument('--skew', type = float, default = 1.0, help = 'exponent of the Zipf law')
+    parser.add_argument('--folds', type = int, default = 10)
+    parser.add_argument('--numpy', action = 'store_true', help = 'use the NumPy matrix engine')
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--skip-memory', action = 'store_true')
+    parser.add_argument('--skip-tokenizer', action = 'store_true')
+    parser.add_argument('--skip-pruning', action = 'store_true')
+    parser.add_argument('--skip-many-classes', action = 'store_true')
+    arguments = parser.parse_args()
+
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+
+    print('[BENCHMARK STARTED]')
+
+    for tagged in (False, True):
+        textType = 'tagged' if tagged else 'untagged'
+
+        print('  -> MEASURING {0} PIPELINE...'.format(textType.upper()), end = '')
+        pipeline = benchmarkPipeline(arguments.documents, arguments.words, arguments.vocabulary, arguments.classes, tagged, arguments.skew, arguments.folds, arguments.numpy, arguments.seed)
+        print(' DONE')
+
+        for stage, measure in pipeline['stages'].items():
+            print('    -> {0}: {1:.3f}s'.format(stage.upper(), measure['time']))
+
+        print('    -> ACCURACY: {:.2%}'.format(pipeline['accuracy']))
+
+        results['pipeline' + textType.capitalize()] = pipeline
+
+    if not arguments.skip_memory:
+        print('  -> MEASURING MEMORY...', end = '')
+        memory = benchmarkMemory()
+        print(' DONE')
+
+        print('    -> VOCABULARY SIZE: {0}'.format(memory['vocabularySize']))
+        print('    -> ARRAYS: {:.1f} MiB'.format(memory['arrays'] / 2.0 ** 20))
+        print('    -> DICTIONARIES: {:.1f} MiB'.format(memory['dictionaries'] / 2.0 ** 20))
+        print('    -> SAVING: {:.1%}'.format(1.0 - float(memory['arrays']) / memory['dictionaries']))
+
+        results['memory'] = memory
+
+    if not arguments.skip_tokenizer:
+        print('  -> MEASURING TOKENIZER...', end = '')
+        tokenizer = benchmarkTokenizer()
+        print(' DONE')
+
+        for textType, tokensBySecond in tokenizer.items():
+            for name, speed in tokensBySecond.items():
+                print('    -> {0} {1}: {2:.0f} TOKENS/S'.format(textType.upper(), name.upper(), speed))
+
+        results['tokenizer'] = tokenizer
+
+    if not arguments.skip_pruning:
+        print('  -> MEASURING PRUNING...', end = '')
+        pruning = benchmarkPruning(nbDocumentsByClass = arguments.documents, nbWordsByDocument = arguments.words, vocabularySize = arguments.vocabulary, nbClasses = arguments.classes, skew = arguments.skew, nbFolds = arguments.folds, seed = arguments.seed)
+        print(' DONE')
+
+        for result in pruning:
+            print('    -> {0}: {1} WORDS, SIZE {2:+.1%}, ACCURACY {3:+.2%}'.format(result['pruning'] or 'NO PRUNING', result['vocabularySize'], -result['sizeReduction'], result['accuracyChange']))
+
+        results['pruning'] = pruning
+
+    if not arguments.skip_many_classes:
+        print('  -> MEASURING MANY CLASSES...', end = '')
+        manyClasses = benchmarkManyClasses(seed = arguments.seed)
+        print(' DONE')
+
+        for engine, engineResults in manyClasses.items():
+            for result in engineResults:
+                print('    -> {0} {1} CLASSES: {2:.3f}ms BY DOCUMENT ({3:.1f}x)'.format(engine.upper(), result['nbClasses'], result['latency'] * 1000, result['growth']))
+
+        results['manyClasses'] = manyClasses
+
+    if arguments.output:
+        with open(arguments.output, 'w', encoding = 'utf-8') as file:
+            json.dump(results, file, indent = 2, sort_keys = True)
+
+        print('  -> RESULTS WRITTEN IN {0}'.format(arguments.output))
+
+    print('[BENCHMARK ENDED]')
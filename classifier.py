@@ -27,14 +27,97 @@
 #                                                                              #
 #------------------------------------------------------------------------------#
 
+import codecs
+import cProfile
+import hashlib
+import multiprocessing
 import os
+import pickle
 import random
 import re
 import string
+import struct
 import sys
+import threading
+import time
+import tracemalloc
+import unicodedata
+import zlib
+
+from array import array
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import islice
+from math import exp, log
+from mmap import ACCESS_COPY, mmap as memoryMap
+from pstats import Stats
+
+# The fcntl module only exists on Unix systems: elsewhere, the size of a
+# CorpusCache is not locked between processes
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# NumPy is optional: it is only required by the matrix scoring engine
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
-from collections import defaultdict
-from math import log
+#------------------------------------------------------------------------------#
+#                                                                              #
+#                                  CONSTANTS                                   #
+#                                                                              #
+#------------------------------------------------------------------------------#
+
+# Word types of tagged files ignored by the tokenizer: punctuation and names
+IGNORED_WORD_TYPES = frozenset(['PUN', 'SENT', 'NAM'])
+
+# Policies for the words unknown to the training: skip them, or give them the
+# Laplace probability log(1 / (amount of words + vocabulary size))
+UNKNOWN_WORDS_SKIP = 'skip'
+UNKNOWN_WORDS_LAPLACE = 'laplace'
+
+# Scores of the feature selection, computed on the contingency table of a word
+# occurrence against the classes
+FEATURE_SELECTION_MUTUAL_INFORMATION = 'mutualInformation'
+FEATURE_SELECTION_CHI_SQUARE = 'chiSquare'
+
+# Binary model file: header, classes, vocabulary, ignore list, pruned words,
+# features and ignore list options, then the occurrence and log numerator arrays
+# (one row by class, one column by word)
+MODEL_MAGIC = b'PYBAYES\x00'
+MODEL_VERSION = 5
+
+_MODEL_HEADER = struct.Struct('<8sHBBIQQ')
+_MODEL_CLASS = struct.Struct('<qqddQ')
+_MODEL_CLASS_VERSION1 = struct.Struct('<qdQ')
+_MODEL_LENGTH = struct.Struct('<Q')
+_MODEL_FEATURES = struct.Struct('<BB')
+_MODEL_STOPWORDS = struct.Struct('<BBB')
+
+# Amount of words scored between two checks of the early exit
+_EARLY_EXIT_BLOCK_SIZE = 256
+
+# Default size of the feature space of a HashedVocabulary
+HASHED_VOCABULARY_SIZE = 2 ** 20
+
+# Version of the CorpusCache entries, part of their key
+CORPUS_CACHE_VERSION = 1
+
+# Part of the maximum size a CorpusCache is reduced to when it exceeds it
+CORPUS_CACHE_EVICTION_TARGET = 0.9
+
+# Amount of words whose accents stripping is remembered, by the _stripAccents
+# memo shared by every StopwordIndex of the process
+STOPWORDS_MEMO_SIZE = 2 ** 16
+
+# Tools of the Profiler
+PROFILER_CPROFILE = 'cProfile'
+PROFILER_TRACEMALLOC = 'tracemalloc'
 
 #------------------------------------------------------------------------------#
 #                                                                              #
@@ -42,206 +125,3527 @@ from math import log
 #                                                                              #
 #------------------------------------------------------------------------------#
 
-class BayesClass(object):
+class StopwordIndex(object):
     """
-    BayesClass objects are used by BayesClassifier objects. Their purpose is to
-    represent a class of the Bayes classification method.
+    StopwordIndex objects are immutable sets of words to ignore, used by
+    Tokenizer and BayesClassifier objects. Build one once, for example with the
+    loadStopwordIndex function, and share it between classifiers: they never
+    change it, and worker processes inherit it.
+
+    Words are normalized once, when they are stored: lowercased and accents
+    stripped, depending on the options. The words filtered are lowercase, as
+    the Tokenizer gives them, so they are looked up as they are in a frozenset;
+    only when accents are folded, each word is stripped of its accents first,
+    through a memo of the process bounded to STOPWORDS_MEMO_SIZE words.
     """
 
-    def __init__(self):
+    def __init__(self, words = (), foldCase = True, foldAccents = False):
         """
-        BayesClass default constructor.
+        StopwordIndex default constructor.
+
+        @param words: the words to ignore (default is empty).
+        @param foldCase: ignore the words whatever their case if this argument
+        is True (default is True).
+        @param foldAccents: ignore the words whatever their accents if this
+        argument is True (default is False).
         """
-        self._nbWords = 0
-        self._wordsDictionary = defaultdict(int)
-        self._wordsDictionaryProbability = defaultdict(float)
+        self._foldCase = foldCase
+        self._foldAccents = foldAccents
+        self._words = frozenset(self.normalize(word) for word in map(str.strip, words) if word)
+        self._fingerprint = None
+
+    def __contains__(self, word):
+        return self.normalize(word) in self._words
+
+    def __len__(self):
+        return len(self._words)
+
+    def __iter__(self):
+        return iter(self._words)
+
+    def normalize(self, word):
+        """
+        Normalize a word like the words of this StopwordIndex instance.
+
+        @param word: the word to normalize.
+        @rtype: str
+        @return: the normalized word.
+        """
+        if self._foldCase:
+            word = word.lower()
+
+        if self._foldAccents:
+            word = _stripAccents(word)
+
+        return word
+
+    def filterWords(self, words):
+        """
+        Filter the words to ignore out of a list of lowercase words.
+
+        @param words: the lowercase words to filter.
+        @rtype: list
+        @return: the words not to ignore, in order.
+        """
+        stopwords = self._words
+
+        if self._foldAccents:
+            # ASCII words have no accent to strip
+            return [word for word in words if (word if word.isascii() else _stripAccents(word)) not in stopwords]
+
+        return [word for word in words if word not in stopwords]
+
+    def getWords(self):
+        """
+        Get the normalized words of this StopwordIndex instance.
+
+        @rtype: frozenset
+        @return: the normalized words.
+        """
+        return self._words
+
+    def getFoldCase(self):
+        """
+        Get the case folding flag of this StopwordIndex instance.
+
+        @rtype: bool
+        @return: the case folding flag.
+        """
+        return self._foldCase
+
+    def getFoldAccents(self):
+        """
+        Get the accent folding flag of this StopwordIndex instance.
+
+        @rtype: bool
+        @return: the accent folding flag.
+        """
+        return self._foldAccents
+
+    def getFingerprint(self):
+        """
+        Get a fingerprint of the words and the options of this StopwordIndex
+        instance, the same in every process.
+
+        @rtype: str
+        @return: the fingerprint.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = '{0}-{1:d}{2:d}'.format(getIgnoreListFingerprint(self._words), self._foldCase, self._foldAccents)
+
+        return self._fingerprint
+
+    def getWordIds(self, vocabulary, firstWordId = 0):
+        """
+        Get the identifiers of the vocabulary words to ignore.
+
+        @param vocabulary: the Vocabulary to look in.
+        @param firstWordId: the identifier of the first word to look at
+        (default is 0).
+        @rtype: set
+        @return: the identifiers of the words to ignore.
+        """
+        words = vocabulary.getWords()
+
+        return set(wordId for wordId in range(firstWordId, len(words)) if words[wordId] in self)
+
+class Tokenizer(object):
+    """
+    Tokenizer objects are used by BayesClassifier objects. Their purpose is to
+    get every important word of a whole text at once, with bulk string
+    operations and a translation table built once.
+
+    Words are lowercased before being looked up in the ignore list. An ignore
+    list which is not a StopwordIndex is frozen in one without folding, so it
+    must hold lowercase words.
+    """
+
+    # Punctuation removal table
+    _NO_PUNCTUATION_TRANSTABLE = str.maketrans('', '', string.punctuation)
+
+    def __init__(self, tagged = False, ignoreList = frozenset()):
+        """
+        Tokenizer default constructor.
+
+        @param tagged: prepare this Tokenizer to read tagged texts if this
+        argument is True; prepare it to read untagged texts otherwise (default
+        is False).
+        @param ignoreList: StopwordIndex, or set of words to ignore (default is
+        empty).
+        """
+        if not isinstance(ignoreList, StopwordIndex):
+            ignoreList = StopwordIndex(ignoreList, foldCase = False)
+
+        self._tagged = tagged
+        self._ignoreList = ignoreList
+
+    def tokenize(self, text):
+        """
+        Get every important word of a text. A word is important when it is not a
+        punctuation and not in the ignore list. In addition, when the text is
+        tagged, names are ignored.
+
+        @param text: the text to read.
+        @rtype: list
+        @return: the important words, in order.
+        """
+        ignoreList = self._ignoreList
+
+        if self._tagged:
+            # Axiom: 1 line = 3 words separate by whitespace
+            # Axiom: wordInfo[0] = original form
+            # Axiom: wordInfo[1] = word type
+            # Axiom: wordInfo[2] = primitive form
+            words = [wordInfo[2].lower() for wordInfo in map(str.split, text.split('\n')) if len(wordInfo) == 3 and wordInfo[1] not in IGNORED_WORD_TYPES]
+        else:
+            words = text.translate(self._NO_PUNCTUATION_TRANSTABLE).lower().split()
+
+        if ignoreList:
+            words = ignoreList.filterWords(words)
+
+        return words
+
+    def tokenizeFile(self, filePath):
+        """
+        Get every important word of a file, read at once.
+
+        @param filePath: the file path of the file to read.
+        @rtype: list
+        @return: the important words, in order.
+        """
+        with open(filePath, encoding = 'utf-8') as file:
+            return self.tokenize(file.read())
+
+    def tokenizeLines(self, lines, nbLinesByChunk = 4096):
+        """
+        Generate an iterator to get every important word of lines of text. Lines
+        are read and tokenized by chunks, so a long stream is never held in
+        memory at once.
+
+        @param lines: the iterable of lines to read (str, or UTF-8 bytes).
+        @param nbLinesByChunk: the amount of lines tokenized at once (default is
+        4096).
+        """
+        lines = _generateDecodedLines(lines)
+
+        while True:
+            chunk = list(islice(lines, nbLinesByChunk))
+
+            if not chunk:
+                break
+
+            yield from self.tokenize('\n'.join(chunk))
+
+    def getStopwordIndex(self):
+        """
+        Get the StopwordIndex of the words ignored by this Tokenizer instance.
+
+        @rtype: StopwordIndex
+        @return: the StopwordIndex.
+        """
+        return self._ignoreList
+
+class Vocabulary(object):
+    """
+    Vocabulary objects are used by BayesClassifier and BayesClass objects. Their
+    purpose is to give every word an integer identifier, once, so that classes
+    can store their words in arrays indexed by these identifiers.
+    """
+
+    def __init__(self, words = ()):
+        """
+        Vocabulary default constructor.
+
+        @param words: the words to identify, in order (default is empty).
+        """
+        self._words = list(words)
+        self._wordsIds = {word: wordId for wordId, word in enumerate(self._words)}
 
     def addWord(self, word):
         """
-        Add a word to the BayesClass. This will increase both the total amount
-        of words and the amount of this single word.
+        Add a word to the vocabulary if it is not already in it.
 
         @param word: word to add.
+        @rtype: int
+        @return: the identifier of the word.
+        """
+        wordId = self._wordsIds.get(word)
+
+        if wordId is None:
+            wordId = self._wordsIds[word] = len(self._words)
+            self._words.append(word)
+
+        return wordId
+
+    def getWordId(self, word, default = None):
+        """
+        Get the identifier of a word.
+
+        @param word: the word to look up.
+        @param default: the value returned for an unknown word (default is
+        None).
+        @rtype: int
+        @return: the identifier of the word.
+        """
+        return self._wordsIds.get(word, default)
+
+    def getWordsIds(self):
+        """
+        Get the dictionary of words identifier of this Vocabulary instance.
+
+        @rtype: dict
+        @return: the dictionary of words identifier.
+        """
+        return self._wordsIds
+
+    def getWords(self):
+        """
+        Get the words of this Vocabulary instance, in identifier order.
+
+        @rtype: list
+        @return: the words.
         """
-        self._nbWords += 1
-        self._wordsDictionary[word] += 1
+        return self._words
 
     def getNbWords(self):
         """
-        Get the total amount of words of this BayesClass instance.
+        Get the amount of words of this Vocabulary instance, like getSize.
 
         @rtype: int
         @return: the amount of words.
         """
-        return self._nbWords
+        return len(self._words)
 
-    def getWordsDictionary(self):
+    def getSize(self):
         """
-        Get the dictionary containing words occurrence of this BayesClass
-        instance.
+        Get the amount of words of this Vocabulary instance.
 
-        @rtype: defaultdict(int)
-        @return: the dictionary of words occurrence.
+        @rtype: int
+        @return: the amount of words.
         """
-        return self._wordsDictionary
+        return len(self._words)
 
-    def getWordsDictionaryProbability(self):
+class HashedVocabulary(object):
+    """
+    HashedVocabulary objects replace Vocabulary objects in the hashed feature
+    mode of BayesClassifier objects: a word is identified by its CRC-32 modulo
+    a fixed size, so the classes arrays never grow, whatever the amount of
+    words or n-grams met. Different words may share an identifier, and words
+    cannot be found back from their identifier.
+
+    Like in a Vocabulary, a word is only known once its identifier was added,
+    and the amount of words is the amount of identifiers added.
+
+    A HashedVocabulary is its own dictionary of words identifier.
+    """
+
+    def __init__(self, size = HASHED_VOCABULARY_SIZE, usedWordIds = ()):
         """
-        Get the dictionary containing words apparition probability of this
-        BayesClass instance.
+        HashedVocabulary default constructor.
 
-        @rtype: defaultdict(float)
-        @return: the dictionary of words apparition probability.
+        @param size: the amount of identifiers (default is
+        HASHED_VOCABULARY_SIZE).
+        @param usedWordIds: the identifiers already added (default is empty).
+        """
+        self._size = size
+        self._usedWordIds = bytearray(size)
+        self._nbWords = 0
+
+        for wordId in usedWordIds:
+            self.addWordId(wordId)
+
+    def __eq__(self, other):
+        return isinstance(other, HashedVocabulary) and other._size == self._size
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._size)
+
+    def addWord(self, word):
         """
-        return self._wordsDictionaryProbability
+        Add the identifier of a word to the vocabulary if it is not already in
+        it.
 
-class BayesClassifier(object):
+        @param word: word to add.
+        @rtype: int
+        @return: the identifier of the word.
+        """
+        return self.addWordId(zlib.crc32(word.encode('utf-8')) % self._size)
+
+    def addWordId(self, wordId):
+        """
+        Add an identifier to the vocabulary if it is not already in it.
+
+        @param wordId: the identifier to add.
+        @rtype: int
+        @return: the identifier.
+        """
+        if not self._usedWordIds[wordId]:
+            self._usedWordIds[wordId] = 1
+            self._nbWords += 1
+
+        return wordId
+
+    def getWordId(self, word, default = None):
+        """
+        Get the identifier of a word.
+
+        @param word: the word to look up.
+        @param default: the value returned for a word whose identifier was not
+        added (default is None).
+        @rtype: int
+        @return: the identifier of the word.
+        """
+        wordId = zlib.crc32(word.encode('utf-8')) % self._size
+
+        return wordId if self._usedWordIds[wordId] else default
+
+    get = getWordId
+
+    def getWordsIds(self):
+        """
+        Get the dictionary of words identifier of this HashedVocabulary
+        instance, which is the instance itself.
+
+        @rtype: HashedVocabulary
+        @return: this instance.
+        """
+        return self
+
+    def getWords(self):
+        """
+        Get the words of this HashedVocabulary instance. As words cannot be
+        found back, every identifier stands for itself.
+
+        @rtype: range
+        @return: the identifiers.
+        """
+        return range(self._size)
+
+    def getSize(self):
+        """
+        Get the amount of identifiers of this HashedVocabulary instance, added
+        or not.
+
+        @rtype: int
+        @return: the size of the vocabulary.
+        """
+        return self._size
+
+    def getNbWords(self):
+        """
+        Get the amount of identifiers added to this HashedVocabulary instance.
+
+        @rtype: int
+        @return: the amount of words.
+        """
+        return self._nbWords
+
+class BayesClass(object):
     """
-    BayesClassifer objects are used to do the classification of texts with the
-    Bayes method. An instance of BayesClassifier can contain one or more
-    BayesClass instances.
+    BayesClass objects are used by BayesClassifier objects. Their purpose is to
+    represent a class of the Bayes classification method.
     """
 
-    def __init__(self, filesTagged = False):
+    def __init__(self, vocabulary = None):
         """
-        BayesClassifier default constructor.
+        BayesClass default constructor.
 
-        @param filesTagged: prepare this BayesClassifier to receive tagged texts
-        if this argument is True; prepare it to receive untagged texts otherwise
-        (default is False).
+        @param vocabulary: the vocabulary shared with the other classes (default
+        is a new vocabulary).
         """
-        self._bayesClasses = {}
-        self._ignoreList = set()
-        self._vocabularyList = set()
-        self._filesTagged = filesTagged
+        self._vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+        self._nbWords = 0
+        self._nbDocuments = 0
+        self._logPrior = 0.0
+
+        # Arrays indexed by word identifier: occurrence, and log(occurrence + 1)
+        # of the training; log(amount of words + vocabulary size) is shared by
+        # all the words
+        self._wordsCount = array('q')
+        self._wordsLogNumerator = array('d')
+        self._logDenominator = 0.0
+        self._changedWordIds = set()
+
+        # Words left out of the denominator, a set shared with the classifier
+        # and changed in place, and their occurrence kept up to date
+        self._prunedWordIds = frozenset()
+        self._nbPrunedWords = 0
+
+    def __getstate__(self):
+        """
+        Get the state of this BayesClass instance to pickle it. Arrays mapped
+        from a model file are copied.
 
-    def setFilesTagged(self, filesTagged):
+        @rtype: dict
+        @return: the state.
         """
-        Set the flag to tell the bayes classifier if it is working with tagged
-        files.
+        state = self.__dict__.copy()
+        state['_wordsCount'] = _toArray(self._wordsCount)
+        state['_wordsLogNumerator'] = _toArray(self._wordsLogNumerator)
 
-        @param filesTagged: flag to tell if files are tagged or not.
+        return state
+
+    def addWord(self, word):
         """
-        self._filesTagged = filesTagged
+        Add a word to the BayesClass. This will increase both the total amount
+        of words and the amount of this single word.
 
-    def addIgnoreListContent(self, filePath):
+        @param word: word to add.
         """
-        Add content to the ignore list. Words in the ignore list are not
-        considered in the training or the classification.
+        self.addWordIds({self._vocabulary.addWord(word): 1})
 
-        @param filePath: the file path of the ignore list content to add.
+    def addWords(self, wordsCount):
         """
-        with open(filePath, encoding = 'utf-8') as file:
-            for line in file:
-                # Axiom: 1 line = 1 word
-                self._ignoreList.add(line.strip())
+        Add words already counted to the BayesClass, as if addWord was called
+        for every occurrence.
 
-    def emptyIgnoreList(self):
+        @param wordsCount: the dictionary of words occurrence to add.
         """
-        Empty the ignore list.
+        addWord = self._vocabulary.addWord
+
+        self.addWordIds({addWord(word): count for word, count in wordsCount.items()})
+
+    def addDocuments(self, nbDocuments = 1):
         """
-        self._ignoreList = set()
+        Add documents to the BayesClass. The amount of documents gives the prior
+        probability of the class.
 
-    def addTrainingContent(self, className, filePath):
+        @param nbDocuments: the amount of documents to add (default is 1).
         """
-        Add training content to the classifier. The more training it has, the
-        more efficient it will be. Be aware that training content should be
-        varied.
+        self._nbDocuments += nbDocuments
 
-        @param className: the bayes class name.
-        @param filePath: the file path of the training content to add.
+    def addWordIds(self, wordIdsCount):
         """
-        if className not in self._bayesClasses:
-            self._bayesClasses[className] = BayesClass()
+        Add words already counted and identified by the vocabulary to the
+        BayesClass.
+
+        @param wordIdsCount: the dictionary of words occurrence by word
+        identifier.
+        """
+        self._wordsCount = _resizeArray(self._wordsCount, self._vocabulary.getSize())
+        wordsCount = self._wordsCount
+        prunedWordIds = self._prunedWordIds
 
-        for word in generateFileIterator(filePath, self._filesTagged, self._ignoreList):
-            self._bayesClasses[className].addWord(word)
-            self._vocabularyList.add(word)
+        for wordId, count in wordIdsCount.items():
+            wordsCount[wordId] += count
+            self._nbWords += count
 
-    def doTraining(self):
+            if wordId in prunedWordIds:
+                self._nbPrunedWords += count
+
+        self._changedWordIds.update(wordIdsCount)
+
+    def removeWords(self, wordsCount):
         """
-        Train the classifier with the training content added before. You can
-        always add training content after, but the bayes classifier will still
-        use the old training as long as you didn't recall this method.
+        Remove words already counted from the BayesClass, undoing addWords. The
+        words stay in the vocabulary.
+
+        @param wordsCount: the dictionary of words occurrence to remove.
+        @raise ValueError: if a word occurs less in the BayesClass; nothing is
+        removed then.
         """
-        vocabularySize = len(self._vocabularyList)
-        
-        for word in self._vocabularyList:
-            for bayesClass in self._bayesClasses.values():
-                numerator = bayesClass.getWordsDictionary()[word] + 1
-                denominator = bayesClass.getNbWords() + vocabularySize
+        getWordId = self._vocabulary.getWordId
+        wordIdsCount = Counter()
 
-                bayesClass.getWordsDictionaryProbability()[word] = log(float(numerator) / float(denominator))
+        for word, count in wordsCount.items():
+            wordId = getWordId(word)
 
-    def emptyTraining(self):
+            if wordId is None:
+                raise ValueError('{0!r} was never added'.format(word))
+
+            wordIdsCount[wordId] += count
+
+        self.removeWordIds(wordIdsCount)
+
+    def removeWordIds(self, wordIdsCount):
         """
-        Empty the training content and the training.
+        Remove words already counted and identified by the vocabulary from the
+        BayesClass, undoing addWordIds.
+
+        @param wordIdsCount: the dictionary of words occurrence by word
+        identifier.
+        @raise ValueError: if a word occurs less in the BayesClass; nothing is
+        removed then.
         """
-        self._bayesClasses = {}
-        self._vocabularyList = set()
-        
-    def classify(self, filePath):
+        wordsCount = self._wordsCount
+
+        for wordId, count in wordIdsCount.items():
+            if (wordsCount[wordId] if wordId < len(wordsCount) else 0) < count:
+                raise ValueError('Word {0} occurs less than {1} times'.format(wordId, count))
+
+        prunedWordIds = self._prunedWordIds
+
+        for wordId, count in wordIdsCount.items():
+            wordsCount[wordId] -= count
+            self._nbWords -= count
+
+            if wordId in prunedWordIds:
+                self._nbPrunedWords -= count
+
+        self._changedWordIds.update(wordIdsCount)
+
+    def removeDocuments(self, nbDocuments = 1):
         """
-        Classify a file passed by his path. This will use the last training done
-        with the doTraining method.
+        Remove documents from the BayesClass, undoing addDocuments.
+
+        @param nbDocuments: the amount of documents to remove (default is 1).
+        @raise ValueError: if the BayesClass holds less documents.
         """
-        fileBayesClassProbability = defaultdict(float)
-        
-        for word in generateFileIterator(filePath, self._filesTagged, self._ignoreList):
-            for bayesClassName, bayesClass in self._bayesClasses.items():
-                fileBayesClassProbability[bayesClassName] += bayesClass.getWordsDictionaryProbability()[word]
+        if nbDocuments > self._nbDocuments:
+            raise ValueError('The class holds {0} documents only'.format(self._nbDocuments))
 
-        return max(fileBayesClassProbability, key = fileBayesClassProbability.get)
+        self._nbDocuments -= nbDocuments
 
-#------------------------------------------------------------------------------#
-#                                                                              #
-#                             UTILITIES FUNCTIONS                              #
-#                                                                              #
-#------------------------------------------------------------------------------#
+    def merge(self, bayesClass):
+        """
+        Add the words and documents counted by another BayesClass to this one,
+        as if its content was added to this BayesClass. Both classes may share
+        their vocabulary or not.
 
-def generateFileIterator(filePath, fileTagged, ignoreList = []):
-    """
+        @param bayesClass: the BayesClass to merge.
+        """
+        wordsCount = bayesClass.getWordsCount()
+
+        if bayesClass._vocabulary is self._vocabulary:
+            self.addWordIds({wordId: count for wordId, count in enumerate(wordsCount) if count})
+        elif isinstance(self._vocabulary, HashedVocabulary) and bayesClass._vocabulary == self._vocabulary:
+            # Hashed vocabularies of the same size identify words the same way
+            addWordId = self._vocabulary.addWordId
+
+            self.addWordIds({addWordId(wordId): count for wordId, count in enumerate(wordsCount) if count})
+        else:
+            words = bayesClass._vocabulary.getWords()
+            self.addWords({words[wordId]: count for wordId, count in enumerate(wordsCount) if count})
+
+        self.addDocuments(bayesClass.getNbDocuments())
+
+    def doTraining(self, vocabularySize, full = False, prunedWordIds = frozenset(), nbVocabularyWords = None):
+        """
+        Train the BayesClass. Only the words added since the last training are
+        computed again, the denominator shared by every word is stored once.
+
+        @param vocabularySize: the size of the classifier vocabulary.
+        @param full: compute again every word if this argument is True (default
+        is False).
+        @param prunedWordIds: the identifiers of the words left out of the
+        denominator, neither counted in the amount of words nor in the
+        vocabulary size (default is empty). Their occurrence is only summed
+        again when the set differs from the one of the last training; see the
+        updatePrunedWordIds method.
+        @param nbVocabularyWords: the amount of vocabulary words counted in the
+        denominator, when it differs from the vocabulary size (default is
+        None, the vocabulary size).
+        @rtype: iterable
+        @return: the identifiers of the words computed again.
+        """
+        self._wordsCount = _resizeArray(self._wordsCount, vocabularySize)
+        self._wordsLogNumerator = _resizeArray(self._wordsLogNumerator, vocabularySize)
+
+        wordsCount = self._wordsCount
+        wordsLogNumerator = self._wordsLogNumerator
+        changedWordIds = range(vocabularySize) if full else self._changedWordIds
+
+        for wordId in changedWordIds:
+            wordsLogNumerator[wordId] = log(wordsCount[wordId] + 1)
+
+        if prunedWordIds is not self._prunedWordIds:
+            self._setPrunedWordIds(prunedWordIds)
+
+        if nbVocabularyWords is None:
+            nbVocabularyWords = vocabularySize
+
+        self._logDenominator = log(max(self._nbWords - self._nbPrunedWords + nbVocabularyWords - len(prunedWordIds), 1))
+        self._changedWordIds = set()
+
+        return changedWordIds
+
+    def updatePrunedWordIds(self, prunedWordIds, addedWordIds, removedWordIds):
+        """
+        Follow a change made in place to the set of pruned words, so that the
+        next training does not sum their occurrence again.
+
+        @param prunedWordIds: the set of pruned words, already changed.
+        @param addedWordIds: the identifiers added to the set.
+        @param removedWordIds: the identifiers removed from the set.
+        """
+        if prunedWordIds is not self._prunedWordIds:
+            self._setPrunedWordIds(prunedWordIds)
+            return
+
+        wordsCount = self._wordsCount
+
+        self._nbPrunedWords += sum([wordsCount[wordId] for wordId in addedWordIds if wordId < len(wordsCount)])
+        self._nbPrunedWords -= sum([wordsCount[wordId] for wordId in removedWordIds if wordId < len(wordsCount)])
+
+    def getNbWords(self):
+        """
+        Get the total amount of words of this BayesClass instance.
+
+        @rtype: int
+        @return: the amount of words.
+        """
+        return self._nbWords
+
+    def getNbDocuments(self):
+        """
+        Get the total amount of documents of this BayesClass instance.
+
+        @rtype: int
+        @return: the amount of documents.
+        """
+        return self._nbDocuments
+
+    def getLogPrior(self):
+        """
+        Get the trained log prior probability of this BayesClass instance.
+
+        @rtype: float
+        @return: the log prior probability.
+        """
+        return self._logPrior
+
+    def setLogPrior(self, logPrior):
+        """
+        Set the trained log prior probability of this BayesClass instance. It is
+        set by the classifier, which knows the documents of every class.
+
+        @param logPrior: the log prior probability.
+        """
+        self._logPrior = logPrior
+
+    def getWordsCount(self):
+        """
+        Get the array of words occurrence of this BayesClass instance, indexed
+        by word identifier.
+
+        @rtype: array('q')
+        @return: the array of words occurrence.
+        """
+        return self._wordsCount
+
+    def getWordsLogNumerator(self):
+        """
+        Get the array of trained log(occurrence + 1) of this BayesClass
+        instance, indexed by word identifier.
+
+        @rtype: array('d')
+        @return: the array of words log numerator.
+        """
+        return self._wordsLogNumerator
+
+    def getLogDenominator(self):
+        """
+        Get the trained log(amount of words + vocabulary size) of this
+        BayesClass instance.
+
+        @rtype: float
+        @return: the log denominator shared by every word.
+        """
+        return self._logDenominator
+
+    def getChangedWordIds(self):
+        """
+        Get the identifiers of the words added to this BayesClass instance since
+        its last training.
+
+        @rtype: set
+        @return: the identifiers of the words to compute again.
+        """
+        return self._changedWordIds
+
+    def setTraining(self, nbWords, nbDocuments, wordsCount, wordsLogNumerator, logDenominator, logPrior, changedWordIds):
+        """
+        Set the training content and the training of this BayesClass instance,
+        as saved from another one.
+
+        @param nbWords: the total amount of words.
+        @param nbDocuments: the total amount of documents.
+        @param wordsCount: the array of words occurrence.
+        @param wordsLogNumerator: the array of trained log(occurrence + 1).
+        @param logDenominator: the trained log(amount of words + vocabulary
+        size).
+        @param logPrior: the trained log prior probability.
+        @param changedWordIds: the identifiers of the words added since the
+        training.
+        """
+        self._nbWords = nbWords
+        self._nbDocuments = nbDocuments
+        self._wordsCount = wordsCount
+        self._wordsLogNumerator = wordsLogNumerator
+        self._logDenominator = logDenominator
+        self._logPrior = logPrior
+        self._changedWordIds = set(changedWordIds)
+        self._prunedWordIds = frozenset()
+        self._nbPrunedWords = 0
+
+    def getWordsDictionary(self):
+        """
+        Get the dictionary containing words occurrence of this BayesClass
+        instance. The dictionary is built on demand from the array of words
+        occurrence.
+
+        @rtype: defaultdict(int)
+        @return: the dictionary of words occurrence.
+        """
+        words = self._vocabulary.getWords()
+
+        return defaultdict(int, ((words[wordId], count) for wordId, count in enumerate(self._wordsCount) if count))
+
+    def getWordsDictionaryProbability(self):
+        """
+        Get the dictionary containing words apparition probability of this
+        BayesClass instance. The dictionary is built on demand from the last
+        training; words this class never met get the probability of a word
+        with no occurrence.
+
+        @rtype: defaultdict(float)
+        @return: the dictionary of words apparition probability.
+        """
+        words = self._vocabulary.getWords()
+        logDenominator = self._logDenominator
+        wordsDictionaryProbability = defaultdict(lambda: -logDenominator)
+
+        for wordId, logNumerator in enumerate(self._wordsLogNumerator):
+            if logNumerator:
+                wordsDictionaryProbability[words[wordId]] = logNumerator - logDenominator
+
+        return wordsDictionaryProbability
+
+    def _setPrunedWordIds(self, prunedWordIds):
+        """
+        Use another set of pruned words, summing their occurrence.
+
+        @param prunedWordIds: the set of pruned words.
+        """
+        wordsCount = self._wordsCount
+
+        self._prunedWordIds = prunedWordIds
+        self._nbPrunedWords = sum([wordsCount[wordId] for wordId in prunedWordIds if wordId < len(wordsCount)])
+
+class Instrumentation(object):
+    """
+    Instrumentation objects record what a BayesClassifier does when its
+    instrumentation is enabled: counters, and the cumulative time spent in
+    each stage. The stages are:
+        - 'read': reading and decoding files;
+        - 'tokenize': getting the important words of texts;
+        - 'count': counting the occurrence of words;
+        - 'addWords': adding counted words to the classes;
+        - 'doTraining': computing the probabilities;
+        - 'score': scoring counted words against the classes.
+
+    The work done in worker processes is not recorded. Classifications running
+    in several threads at once record under a lock, without losing counts.
+    """
+
+    def __init__(self, callback = None):
+        """
+        Instrumentation default constructor.
+
+        @param callback: the function called after every recorded stage with the
+        stage name, its time in seconds and the dictionary of counters it
+        increased (default is None, no call).
+        """
+        self._callback = callback
+        self._lock = threading.Lock()
+        self.reset()
+
+    def __getstate__(self):
+        """
+        Get the state to pickle, without the callback, which may not be
+        picklable, nor the lock.
+        """
+        state = self.__dict__.copy()
+        state['_callback'] = None
+        del state['_lock']
+
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restore the pickled state, with a free lock.
+        """
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """
+        Reset the counters and the times.
+        """
+        with self._lock:
+            self._reset()
+
+    def addCounts(self, **counts):
+        """
+        Increase counters.
+
+        @param counts: the increase by counter name.
+        """
+        with self._lock:
+            counters = self._counters
+
+            for name, count in counts.items():
+                counters[name] += count
+
+    def record(self, stage, elapsedTime, **counts):
+        """
+        Record the time spent in a stage and increase counters, then call the
+        callback.
+
+        @param stage: the stage name.
+        @param elapsedTime: the time spent in seconds.
+        @param counts: the increase by counter name.
+        """
+        with self._lock:
+            counters = self._counters
+            self._times[stage] += elapsedTime
+
+            for name, count in counts.items():
+                counters[name] += count
+
+        if self._callback is not None:
+            self._callback(stage, elapsedTime, counts)
+
+    def getStats(self):
+        """
+        Get a snapshot of the counters and the times.
+
+        @rtype: dict
+        @return: a dictionary with the keys 'counters' (value by counter name)
+        and 'times' (cumulative time in seconds by stage name).
+        """
+        with self._lock:
+            return {'counters': dict(self._counters), 'times': dict(self._times)}
+
+    def _reset(self):
+        """
+        Reset the counters and the times, the lock being held.
+        """
+        self._counters = {
+            'nbFiles': 0,
+            'nbBytes': 0,
+            'nbTokens': 0,
+            'nbDocuments': 0,
+            'nbTrainings': 0,
+            'nbScorings': 0,
+            'nbLookups': 0,
+            'nbUnknownLookups': 0
+        }
+        self._times = {
+            'read': 0.0,
+            'tokenize': 0.0,
+            'count': 0.0,
+            'addWords': 0.0,
+            'doTraining': 0.0,
+            'score': 0.0
+        }
+
+class Profiler(object):
+    """
+    Profiler objects are context managers running the code they wrap under
+    cProfile, to find where the time goes, or tracemalloc, to find where the
+    memory goes:
+
+        with Profiler(PROFILER_TRACEMALLOC) as profiler:
+            classifier.doTraining()
+
+        profiler.printReport()
+    """
+
+    def __init__(self, tool = PROFILER_CPROFILE):
+        """
+        Profiler default constructor.
+
+        @param tool: PROFILER_CPROFILE or PROFILER_TRACEMALLOC (default is
+        PROFILER_CPROFILE).
+        """
+        if tool not in (PROFILER_CPROFILE, PROFILER_TRACEMALLOC):
+            raise ValueError('Profiler tool {0!r} does not exist'.format(tool))
+
+        self._tool = tool
+        self._profile = None
+        self._result = None
+        self._peakMemory = None
+
+    def __enter__(self):
+        if self._tool == PROFILER_CPROFILE:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            tracemalloc.start()
+
+        return self
+
+    def __exit__(self, exceptionType, exception, traceback):
+        if self._tool == PROFILER_CPROFILE:
+            self._profile.disable()
+            self._result = Stats(self._profile)
+        else:
+            self._result = tracemalloc.take_snapshot()
+            self._peakMemory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        return False
+
+    def getResult(self):
+        """
+        Get the result of the profiled run.
+
+        @rtype: pstats.Stats or tracemalloc.Snapshot
+        @return: the statistics of cProfile, or the memory snapshot taken by
+        tracemalloc at the end of the run.
+        """
+        return self._result
+
+    def getPeakMemory(self):
+        """
+        Get the peak of memory allocated during the run, with tracemalloc.
+
+        @rtype: int
+        @return: the peak in bytes, None with cProfile.
+        """
+        return self._peakMemory
+
+    def printReport(self, limit = 20, file = None):
+        """
+        Print the functions taking the most cumulative time, or the lines
+        holding the most memory.
+
+        @param limit: the amount of functions or lines printed (default is 20).
+        @param file: the file-like object to print to (default is None, the
+        standard output).
+        """
+        file = file if file is not None else sys.stdout
+
+        if self._tool == PROFILER_CPROFILE:
+            Stats(self._profile, stream = file).sort_stats('cumulative').print_stats(limit)
+        else:
+            print('Peak memory: {0} bytes'.format(self._peakMemory), file = file)
+
+            for statistic in self._result.statistics('lineno')[:limit]:
+                print(statistic, file = file)
+
+class CorpusCache(object):
+    """
+    CorpusCache objects keep on disk the words occurrence of the files counted
+    by BayesClassifier objects, so that a file counted again with the same
+    settings is neither read nor tokenized. An entry is identified by the file
+    path, its modification time and size (or its content hash), the tagged
+    mode and the ignore list; a modified file or other settings miss the
+    cache. When the entries exceed the maximum size, the least recently used
+    ones are removed.
+
+    The directory is the only state: processes sharing it, like the workers of
+    trainParallel or classifyMany, find the entries of each other, and the
+    maximum size holds for their entries together.
+
+    Entries are pickled: only use a cache directory you trust.
+    """
+
+    def __init__(self, directory, maxSize = 256 * 2 ** 20, useHash = False):
+        """
+        CorpusCache default constructor.
+
+        @param directory: the directory of the entries, created if needed.
+        @param maxSize: the maximum total size of the entries in bytes (default
+        is 256 MiB).
+        @param useHash: identify files by the hash of their content if this
+        argument is True, which reads them but not tokenizes them; by their
+        modification time and size otherwise (default is False).
+        """
+        self._directory = directory
+        self._maxSize = maxSize
+        self._useHash = useHash
+        self._nbHits = 0
+        self._nbMisses = 0
+
+        os.makedirs(directory, exist_ok = True)
+
+        # Total size of the entries, shared by the processes using the
+        # directory, computed again by a scan when unknown
+        self._sizeFilePath = os.path.join(directory, 'size.lock')
+
+    def getKey(self, filePath, tagged, ignoreListFingerprint, nbGrams = 1):
+        """
+        Get the key of the entry of a file counted with the given settings.
+
+        @param filePath: the file path of the file.
+        @param tagged: flag to tell if the file is tagged or not.
+        @param ignoreListFingerprint: the fingerprint of the ignore list, see
+        the StopwordIndex.getFingerprint method.
+        @param nbGrams: the maximum amount of words of the features (default is
+        1).
+        @rtype: str
+        @return: the key of the entry.
+        """
+        if self._useHash:
+            with open(filePath, 'rb') as file:
+                fileId = hashlib.sha1(file.read()).hexdigest()
+        else:
+            stat = os.stat(filePath)
+            fileId = '{0}:{1}'.format(stat.st_mtime_ns, stat.st_size)
+
+        key = '\n'.join((str(CORPUS_CACHE_VERSION), os.path.abspath(filePath), fileId, str(int(bool(tagged))), ignoreListFingerprint, str(nbGrams)))
+
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        Get the words occurrence of an entry, and mark it as recently used. The
+        entries added by other processes are found too.
+
+        @param key: the key of the entry.
+        @rtype: Counter
+        @return: the dictionary of words occurrence, None if the entry does not
+        exist.
+        """
+        filePath = os.path.join(self._directory, key + '.cache')
+
+        try:
+            with open(filePath, 'rb') as file:
+                wordsCount = pickle.load(file)
+
+            os.utime(filePath)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            # Missing, or removed or damaged by another process
+            self._nbMisses += 1
+            return None
+
+        self._nbHits += 1
+
+        return Counter(wordsCount)
+
+    def put(self, key, wordsCount):
+        """
+        Add an entry. When the entries of every process exceed the maximum
+        size, the least recently used ones are removed, down to
+        CORPUS_CACHE_EVICTION_TARGET of the maximum size.
+
+        @param key: the key of the entry.
+        @param wordsCount: the dictionary of words occurrence.
+        """
+        filePath = os.path.join(self._directory, key + '.cache')
+        content = pickle.dumps(dict(wordsCount), pickle.HIGHEST_PROTOCOL)
+
+        try:
+            replacedSize = os.path.getsize(filePath)
+        except OSError:
+            replacedSize = 0
+
+        # Written aside then renamed, so a reader never sees half an entry
+        temporaryFilePath = '{0}.{1}.tmp'.format(filePath, os.getpid())
+
+        with open(temporaryFilePath, 'wb') as file:
+            file.write(content)
+
+        os.replace(temporaryFilePath, filePath)
+
+        with self._lockSize() as sizeFile:
+            size = self._readSize(sizeFile) + len(content) - replacedSize
+
+            if size > self._maxSize:
+                size = self._removeEntries(int(self._maxSize * CORPUS_CACHE_EVICTION_TARGET))
+
+            self._writeSize(sizeFile, size)
+
+    def clear(self):
+        """
+        Remove every entry.
+        """
+        with self._lockSize() as sizeFile:
+            self._writeSize(sizeFile, self._removeEntries(0))
+
+    def getSize(self):
+        """
+        Get the total size of the entries, of every process.
+
+        @rtype: int
+        @return: the size in bytes.
+        """
+        return sum(size for mtime, name, size in self._scanEntries())
+
+    def getNbHits(self):
+        """
+        Get the amount of entries found by the get method.
+
+        @rtype: int
+        @return: the amount of hits.
+        """
+        return self._nbHits
+
+    def getNbMisses(self):
+        """
+        Get the amount of entries not found by the get method.
+
+        @rtype: int
+        @return: the amount of misses.
+        """
+        return self._nbMisses
+
+    @contextmanager
+    def _lockSize(self):
+        """
+        Hold the size file of the directory, locked against the other
+        processes, in a with statement.
+        """
+        with open(os.open(self._sizeFilePath, os.O_RDWR | os.O_CREAT), 'r+b') as sizeFile:
+            if fcntl is not None:
+                fcntl.flock(sizeFile, fcntl.LOCK_EX)
+
+            yield sizeFile
+
+    def _readSize(self, sizeFile):
+        """
+        Read the total size of the entries in the locked size file, or scan the
+        directory if it is not known yet.
+
+        @param sizeFile: the locked size file.
+        @rtype: int
+        @return: the size in bytes.
+        """
+        sizeFile.seek(0)
+        content = sizeFile.read()
+
+        if not content:
+            return self.getSize()
+
+        return int(content)
+
+    def _writeSize(self, sizeFile, size):
+        """
+        Write the total size of the entries in the locked size file.
+
+        @param sizeFile: the locked size file.
+        @param size: the size in bytes.
+        """
+        sizeFile.seek(0)
+        sizeFile.truncate()
+        sizeFile.write(str(size).encode('ascii'))
+
+    def _scanEntries(self):
+        """
+        Scan the entries of the directory.
+
+        @rtype: list
+        @return: the (modification time, file name, size) of every entry, least
+        recently used first.
+        """
+        entries = []
+
+        for entry in os.scandir(self._directory):
+            if entry.name.endswith('.cache'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+
+                entries.append((stat.st_mtime_ns, entry.name, stat.st_size))
+
+        return sorted(entries)
+
+    def _removeEntries(self, targetSize):
+        """
+        Remove the least recently used entries until the entries fit in a size.
+        The size file must be locked.
+
+        @param targetSize: the size to fit in, in bytes.
+        @rtype: int
+        @return: the size of the entries left.
+        """
+        entries = self._scanEntries()
+        size = sum(entrySize for mtime, name, entrySize in entries)
+
+        for mtime, name, entrySize in entries:
+            if size <= targetSize:
+                break
+
+            try:
+                os.remove(os.path.join(self._directory, name))
+            except OSError:
+                continue
+
+            size -= entrySize
+
+        return size
+
+class ReadWriteLock(object):
+    """
+    ReadWriteLock objects let many threads read at once, or one thread write.
+    A waiting writer goes before the readers arriving after it, so a steady
+    flow of readers cannot keep it waiting forever; as a consequence, a thread
+    must not read again while it is already reading.
+
+    A pickled ReadWriteLock is unpickled free.
+    """
+
+    def __init__(self):
+        """
+        ReadWriteLock default constructor.
+        """
+        self._condition = threading.Condition()
+        self._nbReaders = 0
+        self._nbWaitingWriters = 0
+        self._writing = False
+
+    def __getstate__(self):
+        """
+        Get the state to pickle: none, locks cannot be pickled.
+        """
+        return {}
+
+    def __setstate__(self, state):
+        """
+        Restore a free lock.
+        """
+        self.__init__()
+
+    @contextmanager
+    def reading(self):
+        """
+        Hold the lock for reading in a with statement.
+        """
+        with self._condition:
+            while self._writing or self._nbWaitingWriters:
+                self._condition.wait()
+
+            self._nbReaders += 1
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._nbReaders -= 1
+
+                if not self._nbReaders:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def writing(self):
+        """
+        Hold the lock for writing in a with statement.
+        """
+        with self._condition:
+            self._nbWaitingWriters += 1
+
+            while self._writing or self._nbReaders:
+                self._condition.wait()
+
+            self._nbWaitingWriters -= 1
+            self._writing = True
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+class SharedCounter(object):
+    """
+    SharedCounter objects are counters increased by many threads at once
+    without losing increments, like the classifications sharing the read lock
+    of a BayesClassifier.
+
+    A pickled SharedCounter is unpickled with its value and a new lock.
+    """
+
+    def __init__(self, value = 0):
+        """
+        SharedCounter default constructor.
+
+        @param value: the initial value (default is 0).
+        """
+        self._lock = threading.Lock()
+        self._value = value
+
+    def __getstate__(self):
+        """
+        Get the state to pickle: the value, locks cannot be pickled.
+        """
+        return {'_value': self._value}
+
+    def __setstate__(self, state):
+        """
+        Restore the value with a free lock.
+        """
+        self.__init__(state['_value'])
+
+    def add(self, count):
+        """
+        Increase the counter.
+
+        @param count: the increase.
+        """
+        with self._lock:
+            self._value += count
+
+    def getValue(self):
+        """
+        Get the value of the counter.
+
+        @rtype: int
+        @return: the value.
+        """
+        return self._value
+
+    def reset(self):
+        """
+        Reset the counter to 0.
+        """
+        with self._lock:
+            self._value = 0
+
+class BayesClassifier(object):
+    """
+    BayesClassifer objects are used to do the classification of texts with the
+    Bayes method. An instance of BayesClassifier can contain one or more
+    BayesClass instances.
+    """
+
+    def __init__(self, filesTagged = False, useNumpy = False):
+        """
+        BayesClassifier default constructor.
+
+        @param filesTagged: prepare this BayesClassifier to receive tagged texts
+        if this argument is True; prepare it to receive untagged texts otherwise
+        (default is False).
+        @param useNumpy: classify with the NumPy matrix scoring engine if this
+        argument is True; use the classes arrays otherwise (default is False).
+        """
+        self._bayesClasses = {}
+        self._filesTagged = filesTagged
+
+        # Words to ignore, filtered out by the tokenizer, or left out like
+        # pruned words once identified if stopwordsOnWordIds is set: the
+        # vocabulary words from nbCheckedWords on are not checked yet
+        self._stopwordIndex = StopwordIndex()
+        self._stopwordsOnWordIds = False
+        self._stopwordIds = set()
+        self._nbCheckedWords = 0
+        self._tokenizer = self._createTokenizer()
+
+        # Features counted from the words: n-grams up to nbGrams words, hashed
+        # in hashSize identifiers if hashSize is set
+        self._nbGrams = 1
+        self._hashSize = None
+
+        # Vocabulary words are identified in order of appearance, the first
+        # trainedVocabularySize words are known by the last training
+        self._vocabulary = Vocabulary()
+        self._trainedVocabularySize = 0
+
+        # Classification of the words unknown to the training
+        self._unknownWordsPolicy = UNKNOWN_WORDS_SKIP
+        self._nbUnknownWords = SharedCounter()
+
+        # Largest gap between two classes that a word can make, computed on
+        # demand by the early exit of predictScoresWords
+        self._maxWordSpread = None
+
+        # Matrix scoring engine, updated by doTraining; in the many classes
+        # mode, the matrix columns (the words) are contiguous
+        self._useNumpy = False
+        self._manyClasses = False
+        self._bayesClassesNames = []
+        self._logNumeratorMatrix = None
+        self._logDenominators = None
+        self._logPriors = None
+
+        # Pruning of the vocabulary applied by doTraining: the pruned words are
+        # left out of the training and the classification
+        self._minWordCount = 1
+        self._maxVocabularySize = None
+        self._featureSelection = None
+        self._nbSelectedWords = None
+        self._prunedWordIds = set()
+
+        # Words kept by the frequency and feature selection rankings, which are
+        # computed again by full trainings only, None without ranking
+        self._selectedWordIds = None
+        self._pruningOutdated = True
+
+        # Words whose every occurrence was removed, classified as unknown words
+        self._forgottenWordIds = set()
+
+        # Classifications read the training under the lock, partialFit and
+        # forget change it under the lock
+        self._lock = ReadWriteLock()
+
+        # Disabled instrumentation costs a test by file or content counted
+        self._instrumentation = None
+
+        # Cache of the files words occurrence
+        self._corpusCache = None
+
+        self.setUseNumpy(useNumpy)
+
+    def setFilesTagged(self, filesTagged):
+        """
+        Set the flag to tell the bayes classifier if it is working with tagged
+        files.
+
+        @param filesTagged: flag to tell if files are tagged or not.
+        """
+        self._filesTagged = filesTagged
+        self._tokenizer = self._createTokenizer()
+
+    def setUseNumpy(self, useNumpy):
+        """
+        Set the flag to tell the bayes classifier if it must use the NumPy
+        matrix scoring engine. The matrix is built by the next call to the
+        doTraining method; until then, the classes arrays are used.
+
+        @param useNumpy: flag to tell if the matrix scoring engine is used.
+        """
+        if useNumpy and numpy is None:
+            raise ImportError('NumPy is required by the matrix scoring engine')
+
+        self._useNumpy = useNumpy
+
+        if not useNumpy:
+            self._manyClasses = False
+            self._dropProbabilityMatrix()
+
+    def setManyClasses(self, manyClasses):
+        """
+        Set the flag to tell the bayes classifier if the matrix scoring engine
+        must be laid out for many classes. The matrix is stored column by
+        column, so the classes of a word are contiguous: scoring a document
+        reads one block by word instead of one value by word and by class,
+        which scales much better with hundreds of classes. A model loaded in
+        this mode is copied, not shared in place.
+
+        @param manyClasses: flag to tell if the many classes mode is used.
+        """
+        if manyClasses and not self._useNumpy:
+            raise ValueError('The many classes mode requires the matrix scoring engine')
+
+        self._manyClasses = manyClasses
+
+        if self._logNumeratorMatrix is not None:
+            self._logNumeratorMatrix = numpy.asarray(self._logNumeratorMatrix, order = self._getMatrixOrder())
+
+    def setUnknownWordsPolicy(self, unknownWordsPolicy):
+        """
+        Set the policy used by the classification for the words unknown to the
+        training: UNKNOWN_WORDS_SKIP ignores them (default), UNKNOWN_WORDS_LAPLACE
+        gives them the probability of a word with no occurrence. In both cases,
+        the training is left unchanged.
+
+        @param unknownWordsPolicy: the policy for unknown words.
+        """
+        if unknownWordsPolicy not in (UNKNOWN_WORDS_SKIP, UNKNOWN_WORDS_LAPLACE):
+            raise ValueError('Unknown words policy {0!r} does not exist'.format(unknownWordsPolicy))
+
+        self._unknownWordsPolicy = unknownWordsPolicy
+        self._maxWordSpread = None
+
+    def setFeatures(self, nbGrams = 1, hashSize = None):
+        """
+        Set the features counted from the words of the texts, which empties the
+        training content. With n-grams, every word is followed by the n-grams
+        ending with it, up to nbGrams words, like 'pas', 'bon' and 'pas bon'
+        for nbGrams = 2. With a hash size, features are identified by a
+        HashedVocabulary: the model size is fixed whatever the corpus, but
+        features sharing an identifier are counted together and the words of
+        the classes cannot be listed.
+
+        @param nbGrams: the maximum amount of words of the features (default is
+        1, words only).
+        @param hashSize: the amount of identifiers of the hashed feature space,
+        None to identify every feature in order of appearance (default is None).
+        """
+        if nbGrams < 1:
+            raise ValueError('nbGrams must be 1 or more')
+
+        if hashSize is not None and self._stopwordsOnWordIds:
+            raise ValueError('An ignore list cannot be applied on hashed word identifiers')
+
+        self._nbGrams = nbGrams
+        self._hashSize = hashSize
+        self.emptyTraining()
+
+    def setPruning(self, minWordCount = 1, maxVocabularySize = None, featureSelection = None, nbSelectedWords = None):
+        """
+        Set the pruning of the vocabulary applied by the next call to the
+        doTraining method. Words are kept when they occur at least
+        minWordCount times in all classes; then the maxVocabularySize most
+        frequent ones are kept; then the nbSelectedWords best ones for the
+        feature selection score are kept. The other words are left out of the
+        training and the classification, like ignored words, but their counts
+        are kept so that the pruning can change.
+
+        Incremental trainings only check the minimum occurrence of the words
+        added or removed since the last training. The frequency and feature
+        selection rankings are computed again by the next training after this
+        call and by full trainings; in between, the words they did not keep,
+        new words included, stay pruned.
+
+        @param minWordCount: the minimum occurrence of a kept word (default is
+        1, no pruning).
+        @param maxVocabularySize: the maximum amount of kept words by
+        frequency, None for no limit (default is None).
+        @param featureSelection: FEATURE_SELECTION_MUTUAL_INFORMATION or
+        FEATURE_SELECTION_CHI_SQUARE, None for no selection (default is None).
+        @param nbSelectedWords: the amount of words kept by the feature
+        selection (default is None, no selection).
+        """
+        if featureSelection not in (None, FEATURE_SELECTION_MUTUAL_INFORMATION, FEATURE_SELECTION_CHI_SQUARE):
+            raise ValueError('Feature selection {0!r} does not exist'.format(featureSelection))
+
+        self._minWordCount = minWordCount
+        self._maxVocabularySize = maxVocabularySize
+        self._featureSelection = featureSelection
+        self._nbSelectedWords = nbSelectedWords
+        self._pruningOutdated = True
+
+    def getNbPrunedWords(self):
+        """
+        Get the amount of vocabulary words pruned by the last training.
+
+        @rtype: int
+        @return: the amount of pruned words.
+        """
+        return len(self._prunedWordIds)
+
+    def compactVocabulary(self):
+        """
+        Remove the words pruned or forgotten by the last training from the
+        vocabulary and the classes, then train again, so that the model and its
+        file get smaller. Their counts are lost: if they are added again, they
+        start from zero.
+        """
+        prunedWordIds = self._prunedWordIds | self._forgottenWordIds
+
+        if not prunedWordIds:
+            return
+
+        if self._hashSize is not None:
+            raise ValueError('A hashed vocabulary cannot be compacted')
+
+        words = self._vocabulary.getWords()
+        keptWordIds = [wordId for wordId in range(len(words)) if wordId not in prunedWordIds]
+        vocabulary = Vocabulary([words[wordId] for wordId in keptWordIds])
+        bayesClasses = {}
+
+        for bayesClassName, bayesClass in self._bayesClasses.items():
+            wordsCount = _resizeArray(bayesClass.getWordsCount(), len(words))
+            keptWordsCount = array('q', [wordsCount[wordId] for wordId in keptWordIds])
+
+            bayesClasses[bayesClassName] = BayesClass(vocabulary)
+            bayesClasses[bayesClassName].setTraining(sum(keptWordsCount), bayesClass.getNbDocuments(), keptWordsCount, array('d'), 0.0, bayesClass.getLogPrior(), ())
+
+        self._bayesClasses = bayesClasses
+        self._vocabulary = vocabulary
+        self._prunedWordIds = set()
+        self._forgottenWordIds = set()
+        self._stopwordIds = set()
+        self._nbCheckedWords = 0
+        self._dropProbabilityMatrix()
+        self.doTraining(full = True)
+
+    def setCorpusCache(self, corpusCache):
+        """
+        Set the cache of the files words occurrence used when files are counted
+        by the training, the classification and the cross-validation.
+
+        @param corpusCache: the CorpusCache, None to count every file.
+        """
+        self._corpusCache = corpusCache
+
+    def enableInstrumentation(self, callback = None):
+        """
+        Enable the instrumentation of the classifier, with new counters and
+        times. See the Instrumentation class.
+
+        @param callback: the function called after every recorded stage with the
+        stage name, its time in seconds and the dictionary of counters it
+        increased (default is None, no call).
+        """
+        self._instrumentation = Instrumentation(callback)
+
+    def disableInstrumentation(self):
+        """
+        Disable the instrumentation of the classifier and drop its records.
+        """
+        self._instrumentation = None
+
+    def getStats(self):
+        """
+        Get a snapshot of the instrumentation records. See the
+        Instrumentation.getStats method.
+
+        @rtype: dict
+        @return: the counters and times, None if the instrumentation is
+        disabled.
+        """
+        if self._instrumentation is None:
+            return None
+
+        return self._instrumentation.getStats()
+
+    def resetStats(self):
+        """
+        Reset the instrumentation records, if the instrumentation is enabled.
+        """
+        if self._instrumentation is not None:
+            self._instrumentation.reset()
+
+    def getVocabularySize(self):
+        """
+        Get the amount of different words met by the training.
+
+        @rtype: int
+        @return: the size of the vocabulary.
+        """
+        return self._vocabulary.getSize()
+
+    def getNbUnknownWords(self):
+        """
+        Get the amount of unknown words met by the classifications done in this
+        process since the counter was last reset.
+
+        @rtype: int
+        @return: the amount of unknown words.
+        """
+        return self._nbUnknownWords.getValue()
+
+    def resetNbUnknownWords(self):
+        """
+        Reset the counter of unknown words met by the classifications.
+        """
+        self._nbUnknownWords.reset()
+
+    def addIgnoreListContent(self, filePath):
+        """
+        Add content to the ignore list. Words in the ignore list are not
+        considered in the training or the classification. The ignore list is
+        replaced by a new StopwordIndex, with the same options.
+
+        @param filePath: the file path of the ignore list content to add.
+        """
+        with open(filePath, encoding = 'utf-8') as file:
+            # Axiom: 1 line = 1 word
+            words = list(self._stopwordIndex) + file.read().split('\n')
+
+        self.setStopwordIndex(StopwordIndex(words, self._stopwordIndex.getFoldCase(), self._stopwordIndex.getFoldAccents()), self._stopwordsOnWordIds)
+
+    def emptyIgnoreList(self):
+        """
+        Empty the ignore list.
+        """
+        self.setStopwordIndex(StopwordIndex((), self._stopwordIndex.getFoldCase(), self._stopwordIndex.getFoldAccents()), self._stopwordsOnWordIds)
+
+    def setStopwordIndex(self, stopwordIndex, onWordIds = False):
+        """
+        Set the ignore list. The StopwordIndex is shared, not copied.
+
+        By default, the ignored words are filtered out by the tokenizer. When
+        they are applied on word identifiers, the words are counted and then
+        left out by the next call to the doTraining method, like pruned words:
+        n-grams keep their ignored words.
+
+        @param stopwordIndex: the StopwordIndex of the words to ignore.
+        @param onWordIds: apply the ignore list on the vocabulary identifiers
+        if this argument is True; on the words read otherwise (default is
+        False).
+        """
+        if onWordIds and self._hashSize is not None:
+            raise ValueError('An ignore list cannot be applied on hashed word identifiers')
+
+        self._stopwordIndex = stopwordIndex
+        self._stopwordsOnWordIds = onWordIds
+        self._stopwordIds = set()
+        self._nbCheckedWords = 0
+        self._pruningOutdated = True
+        self._tokenizer = self._createTokenizer()
+
+    def getStopwordIndex(self):
+        """
+        Get the StopwordIndex of the ignore list.
+
+        @rtype: StopwordIndex
+        @return: the StopwordIndex.
+        """
+        return self._stopwordIndex
+
+    def addTrainingContent(self, className, filePath):
+        """
+        Add training content to the classifier. The more training it has, the
+        more efficient it will be. Be aware that training content should be
+        varied.
+
+        @param className: the bayes class name.
+        @param filePath: the file path of the training content to add.
+        """
+        self.addTrainingWordsCount(className, self._countFileWords(filePath))
+
+    def addTrainingStream(self, className, stream):
+        """
+        Add training content read from a stream to the classifier, like
+        addTrainingContent does with a file.
+
+        @param className: the bayes class name.
+        @param stream: the file-like object or iterable of lines to read, in
+        text or binary (UTF-8) mode.
+        """
+        self.addTrainingWordsCount(className, self._countLinesWords(stream))
+
+    def addTrainingWordsCount(self, className, wordsCount, nbDocuments = 1):
+        """
+        Add training content already counted to the classifier, like
+        addTrainingContent does with a file.
+
+        @param className: the bayes class name.
+        @param wordsCount: the dictionary of words occurrence to add.
+        @param nbDocuments: the amount of documents counted (default is 1).
+        """
+        if className not in self._bayesClasses:
+            self._bayesClasses[className] = BayesClass(self._vocabulary)
+
+        instrumentation = self._instrumentation
+
+        if instrumentation is not None:
+            start = time.perf_counter()
+
+        self._bayesClasses[className].addWords(wordsCount)
+        self._bayesClasses[className].addDocuments(nbDocuments)
+
+        if instrumentation is not None:
+            instrumentation.record('addWords', time.perf_counter() - start, nbDocuments = nbDocuments)
+
+    def removeTrainingWordsCount(self, className, wordsCount, nbDocuments = 1):
+        """
+        Remove training content already counted from the classifier, undoing
+        addTrainingWordsCount. Words left without occurrence in every class
+        stay in the vocabulary, but from the next training on they are
+        classified as unknown words, until they are added again.
+
+        @param className: the bayes class name.
+        @param wordsCount: the dictionary of words occurrence to remove.
+        @param nbDocuments: the amount of documents counted (default is 1).
+        @raise ValueError: if the class does not hold this content; nothing is
+        removed then.
+        """
+        if className not in self._bayesClasses:
+            raise ValueError('Bayes class {0!r} does not exist'.format(className))
+
+        bayesClass = self._bayesClasses[className]
+
+        if nbDocuments > bayesClass.getNbDocuments():
+            raise ValueError('Bayes class {0!r} holds {1} documents only'.format(className, bayesClass.getNbDocuments()))
+
+        bayesClass.removeWords(wordsCount)
+        bayesClass.removeDocuments(nbDocuments)
+
+    def partialFit(self, className, text):
+        """
+        Add a labeled text to the training and train the classifier at once.
+        Only the words of the text, the denominators and the priors are
+        computed again. The classifier may classify from other threads
+        meanwhile: they see the training before or after the text, never in
+        between.
+
+        @param className: the bayes class name.
+        @param text: the text to add (str, or UTF-8 bytes).
+        """
+        wordsCount = self._countTextWords(text)
+
+        with self._lock.writing():
+            self.addTrainingWordsCount(className, wordsCount)
+            self.doTraining()
+
+    def forget(self, className, text):
+        """
+        Remove a labeled text added before from the training and train the
+        classifier at once, undoing partialFit or addTrainingContent. Like
+        partialFit, it is safe against classifications from other threads.
+
+        @param className: the bayes class name.
+        @param text: the text to remove (str, or UTF-8 bytes).
+        @raise ValueError: if the class does not hold this text; the training
+        is not modified then.
+        """
+        wordsCount = self._countTextWords(text)
+
+        with self._lock.writing():
+            self.removeTrainingWordsCount(className, wordsCount)
+            self.doTraining()
+
+    def merge(self, classifier):
+        """
+        Add the training content of another classifier to this one, class by
+        class, as if its content was added to this classifier. Only the counts
+        are merged, not the settings or the ignore list; you still have to
+        call the doTraining method.
+
+        @param classifier: the BayesClassifier to merge.
+        """
+        if (classifier._nbGrams, classifier._hashSize) != (self._nbGrams, self._hashSize):
+            raise ValueError('Classifiers with different features cannot be merged')
+
+        for bayesClassName, bayesClass in classifier._bayesClasses.items():
+            if bayesClassName not in self._bayesClasses:
+                self._bayesClasses[bayesClassName] = BayesClass(self._vocabulary)
+
+            self._bayesClasses[bayesClassName].merge(bayesClass)
+
+    def trainParallel(self, filePathsByClass, workers = None, nbFilesByShard = None):
+        """
+        Add training content from many files and train the classifier. The files
+        of every class are cut into shards of consecutive files; worker
+        processes read and count the shards, then the counts are added to this
+        classifier in order. The result is the same as calling the
+        addTrainingContent method for every file, in order, then the doTraining
+        method.
+
+        @param filePathsByClass: the dictionary of file paths lists by bayes
+        class name.
+        @param workers: the amount of worker processes (default is the amount
+        of CPUs). With 1 worker, files are counted in this process.
+        @param nbFilesByShard: the amount of files counted together (default is
+        None, about four shards by worker and class).
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        shards = []
+
+        for className, filePaths in filePathsByClass.items():
+            filePaths = list(filePaths)
+            shardSize = nbFilesByShard or max(1, -(-len(filePaths) // (4 * workers)))
+
+            for i in range(0, len(filePaths), shardSize):
+                shards.append((className, filePaths[i:i + shardSize]))
+
+        if min(workers, len(shards)) <= 1:
+            shardsWordsCount = [self._countFilesWords(filePaths) for className, filePaths in shards]
+        else:
+            shardsWordsCount = _mapInWorkers(_countFilesWordsInWorker, [filePaths for className, filePaths in shards], workers, self._createUntrainedCopy())
+
+        for (className, filePaths), wordsCount in zip(shards, shardsWordsCount):
+            self.addTrainingWordsCount(className, wordsCount, len(filePaths))
+
+        self.doTraining()
+
+    def doTraining(self, full = False):
+        """
+        Train the classifier with the training content added before. You can
+        always add training content after, but the bayes classifier will still
+        use the old training as long as you didn't recall this method.
+
+        The training is incremental: only the words added since the last
+        training are computed again, so its cost follows the new content and
+        not the whole vocabulary.
+
+        @param full: compute again every word if this argument is True (default
+        is False).
+        """
+        instrumentation = self._instrumentation
+
+        if instrumentation is not None:
+            start = time.perf_counter()
+
+        vocabularySize = self._vocabulary.getSize()
+        nbDocuments = sum(bayesClass.getNbDocuments() for bayesClass in self._bayesClasses.values())
+        changedWordIds = {}
+        classesChangedWordIds = set().union(*[bayesClass.getChangedWordIds() for bayesClass in self._bayesClasses.values()])
+
+        # Words left without occurrence are forgotten, until added again
+        for wordId in classesChangedWordIds:
+            if self._isWordCounted(wordId):
+                self._forgottenWordIds.discard(wordId)
+            elif wordId < vocabularySize:
+                self._forgottenWordIds.add(wordId)
+
+        nbVocabularyWords = self._vocabulary.getNbWords() - len(self._forgottenWordIds)
+
+        if self._stopwordsOnWordIds:
+            self._stopwordIds |= self._stopwordIndex.getWordIds(self._vocabulary, self._nbCheckedWords)
+            self._nbCheckedWords = vocabularySize
+
+        if full or self._pruningOutdated:
+            self._prunedWordIds = set(self._selectPrunedWordIds(vocabularySize)) | self._stopwordIds
+            self._pruningOutdated = False
+        else:
+            self._updatePrunedWordIds(classesChangedWordIds)
+
+        for bayesClassName, bayesClass in self._bayesClasses.items():
+            changedWordIds[bayesClassName] = bayesClass.doTraining(vocabularySize, full, self._prunedWordIds, nbVocabularyWords)
+
+            # Without documents, every class is equally probable
+            if not nbDocuments:
+                bayesClass.setLogPrior(-log(len(self._bayesClasses)))
+            elif bayesClass.getNbDocuments():
+                bayesClass.setLogPrior(log(float(bayesClass.getNbDocuments()) / nbDocuments))
+            else:
+                bayesClass.setLogPrior(float('-inf'))
+
+        self._trainedVocabularySize = vocabularySize
+        self._maxWordSpread = None
+
+        if self._useNumpy:
+            self._updateProbabilityMatrix(changedWordIds, full)
+
+        if instrumentation is not None:
+            instrumentation.record('doTraining', time.perf_counter() - start, nbTrainings = 1)
+
+    def emptyTraining(self):
+        """
+        Empty the training content and the training.
+        """
+        self._bayesClasses = {}
+        self._vocabulary = Vocabulary() if self._hashSize is None else HashedVocabulary(self._hashSize)
+        self._trainedVocabularySize = 0
+        self._prunedWordIds = set()
+        self._forgottenWordIds = set()
+        self._stopwordIds = set()
+        self._nbCheckedWords = 0
+        self._selectedWordIds = None
+        self._pruningOutdated = True
+        self._maxWordSpread = None
+        self._dropProbabilityMatrix()
+
+    def classify(self, filePath):
+        """
+        Classify a file passed by his path. This will use the last training done
+        with the doTraining method.
+
+        @param filePath: the file path of the file to classify.
+        @rtype: str
+        @return: the name of the most probable bayes class.
+        """
+        return self.classifyWordsCount(self._countFileWords(filePath))
+
+    def classifyText(self, text):
+        """
+        Classify a text held in memory. This will use the last training done
+        with the doTraining method.
+
+        @param text: the text to classify (str, or UTF-8 bytes).
+        @rtype: str
+        @return: the name of the most probable bayes class.
+        """
+        return self.classifyWordsCount(self._countTextWords(text))
+
+    def classifyTexts(self, texts):
+        """
+        Classify a batch of texts held in memory. This will use the last
+        training done with the doTraining method.
+
+        @param texts: the texts to classify (str, or UTF-8 bytes).
+        @rtype: list
+        @return: the name of the most probable bayes class of every text, in
+        order.
+        """
+        return self.classifyWordsCountBatch([self._countTextWords(text) for text in texts])
+
+    def classifyStream(self, stream):
+        """
+        Classify a stream, read line by line. This will use the last training
+        done with the doTraining method.
+
+        @param stream: the file-like object or iterable of lines to classify, in
+        text or binary (UTF-8) mode.
+        @rtype: str
+        @return: the name of the most probable bayes class.
+        """
+        return self.classifyWordsCount(self._countLinesWords(stream))
+
+    def classifyDocuments(self, stream, delimiter, chunkSize = 65536):
+        """
+        Generate an iterator to classify the documents of a stream holding many
+        documents separated by a delimiter. Only the current document is held
+        in memory. This will use the last training done with the doTraining
+        method.
+
+        @param stream: the file-like object to read, in text or binary (UTF-8)
+        mode.
+        @param delimiter: the string separating two documents.
+        @param chunkSize: the amount of characters or bytes read at once
+        (default is 65536).
+        """
+        for document in generateDocumentsIterator(stream, delimiter, chunkSize):
+            yield self.classifyText(document)
+
+    def classifyWordsCount(self, wordsCount):
+        """
+        Classify content already counted. This will use the last training done
+        with the doTraining method. Like the version 1.0, the classification
+        only compares the words probability; the prior probability of the
+        classes is used by the predictScores method.
+
+        @param wordsCount: the dictionary of words occurrence to classify.
+        @rtype: str
+        @return: the name of the most probable bayes class.
+        """
+        with self._lock.reading():
+            fileBayesClassProbability = self._computeLogLikelihoods(wordsCount)
+
+        return max(fileBayesClassProbability, key = fileBayesClassProbability.get)
+
+    def classifyWordsCountBatch(self, wordsCounts):
+        """
+        Classify a batch of contents already counted. With the matrix scoring
+        engine, the whole batch is scored by a single matrix product over the
+        words of the batch. This will use the last training done with the
+        doTraining method.
+
+        @param wordsCounts: the dictionaries of words occurrence to classify.
+        @rtype: list
+        @return: the name of the most probable bayes class of every content, in
+        order.
+        """
+        with self._lock.reading():
+            return self._classifyWordsCountBatch(wordsCounts)
+
+    def predictScores(self, filePath, earlyExitBudget = None):
+        """
+        Score a file passed by his path against every class, in a single pass
+        over its words. See the predictScoresWords method.
+
+        @param filePath: the file path of the file to score.
+        @param earlyExitBudget: the amount of words that could still follow
+        when the early exit is checked, None to read the whole file (default is
+        None).
+        @rtype: dict
+        @return: the scores, see the predictScoresWords method.
+        """
+        if earlyExitBudget is None:
+            return self.predictScoresWords(self._tokenizer.tokenizeFile(filePath))
+
+        # The file is read by chunks, so it is no longer read after the exit
+        with open(filePath, encoding = 'utf-8') as file:
+            return self.predictScoresWords(self._tokenizer.tokenizeLines(file), earlyExitBudget)
+
+    def predictProba(self, filePath, earlyExitBudget = None):
+        """
+        Get the probability of every class for a file passed by his path. See
+        the predictScoresWords method.
+
+        @param filePath: the file path of the file to score.
+        @param earlyExitBudget: the amount of words that could still follow
+        when the early exit is checked, None to read the whole file (default is
+        None).
+        @rtype: dict
+        @return: the probability by bayes class name.
+        """
+        return self.predictScores(filePath, earlyExitBudget)['probabilities']
+
+    def predictScoresWords(self, words, earlyExitBudget = None):
+        """
+        Score words against every class, in a single pass. The log score of a
+        class is its log prior probability plus the log likelihood of the
+        words; the probabilities are the log scores normalized with log-sum-exp.
+
+        With an early exit budget, words are scored by blocks and the reading
+        stops as soon as the lead of the best class is larger than what this
+        amount of words could overturn, given the largest gap a single word
+        makes between two classes.
+
+        @param words: the iterable of words to score, in order; the features
+        are counted from them.
+        @param earlyExitBudget: the amount of features that could still follow
+        when the early exit is checked, None to read every word (default is
+        None).
+        @rtype: dict
+        @return: a dictionary with the keys 'className' (the most probable bayes
+        class name), 'logScores', 'logLikelihoods', 'logPriors' and
+        'probabilities' (dictionaries by bayes class name), 'nbWords' (the
+        amount of words scored) and 'earlyExit' (True if words were left
+        unread).
+        """
+        with self._lock.reading():
+            words = iter(self._generateFeatures(words))
+            blockSize = None if earlyExitBudget is None else _EARLY_EXIT_BLOCK_SIZE
+
+            block = Counter(islice(words, blockSize))
+            logLikelihoods = self._computeLogLikelihoods(block)
+            logPriors = {bayesClassName: self._bayesClasses[bayesClassName].getLogPrior() for bayesClassName in logLikelihoods}
+            nbWords = sum(block.values())
+            earlyExit = False
+
+            if earlyExitBudget is not None:
+                maxLeadChange = earlyExitBudget * self._getMaxWordSpread()
+
+                while True:
+                    logScores = sorted(logLikelihoods[bayesClassName] + logPriors[bayesClassName] for bayesClassName in logLikelihoods)
+
+                    if len(logScores) < 2 or logScores[-1] - logScores[-2] > maxLeadChange:
+                        earlyExit = next(words, None) is not None
+                        break
+
+                    block = Counter(islice(words, blockSize))
+
+                    if not block:
+                        break
+
+                    nbWords += sum(block.values())
+
+                    for bayesClassName, logLikelihood in self._computeLogLikelihoods(block).items():
+                        logLikelihoods[bayesClassName] += logLikelihood
+
+            logScores = {bayesClassName: logLikelihood + logPriors[bayesClassName] for bayesClassName, logLikelihood in logLikelihoods.items()}
+
+            return {
+                'className': max(logScores, key = logScores.get) if logScores else None,
+                'logScores': logScores,
+                'logLikelihoods': logLikelihoods,
+                'logPriors': logPriors,
+                'probabilities': _normalizeLogScores(logScores),
+                'nbWords': nbWords,
+                'earlyExit': earlyExit
+            }
+
+    def predictTopClasses(self, filePath, nbClasses = 5, threshold = None):
+        """
+        Get the most probable classes of a file passed by his path. See the
+        predictTopClassesWordsCountBatch method.
+
+        @param filePath: the file path of the file to score.
+        @param nbClasses: the maximum amount of classes, None for no limit
+        (default is 5).
+        @param threshold: the minimum probability of the classes, or a
+        dictionary of minimum probabilities by bayes class name, None for no
+        minimum (default is None).
+        @rtype: list
+        @return: the (bayes class name, probability) tuples, most probable
+        first.
+        """
+        return self.predictTopClassesWordsCountBatch([self._countFileWords(filePath)], nbClasses, threshold)[0]
+
+    def predictTopClassesTexts(self, texts, nbClasses = 5, threshold = None):
+        """
+        Get the most probable classes of a batch of texts held in memory. See
+        the predictTopClassesWordsCountBatch method.
+
+        @param texts: the texts to score (str, or UTF-8 bytes).
+        @param nbClasses: the maximum amount of classes by text, None for no
+        limit (default is 5).
+        @param threshold: the minimum probability of the classes, or a
+        dictionary of minimum probabilities by bayes class name, None for no
+        minimum (default is None).
+        @rtype: list
+        @return: the (bayes class name, probability) tuples of every text, in
+        order.
+        """
+        return self.predictTopClassesWordsCountBatch([self._countTextWords(text) for text in texts], nbClasses, threshold)
+
+    def predictTopClassesWordsCountBatch(self, wordsCounts, nbClasses = 5, threshold = None):
+        """
+        Get the most probable classes of a batch of contents already counted:
+        the top-k classes with nbClasses, the multi-label classes with a
+        threshold, or both. The probabilities are the ones of the predictProba
+        method.
+
+        With the matrix scoring engine, every class of every content is scored
+        by a single matrix product, and only the best classes are sorted, so
+        the cost of a content grows slowly with the amount of classes; see the
+        setManyClasses method.
+
+        @param wordsCounts: the dictionaries of words occurrence to score.
+        @param nbClasses: the maximum amount of classes by content, None for no
+        limit (default is 5).
+        @param threshold: the minimum probability of the classes, or a
+        dictionary of minimum probabilities by bayes class name (the classes
+        not in it have no minimum), None for no minimum (default is None).
+        @rtype: list
+        @return: the (bayes class name, probability) tuples of every content,
+        most probable first, in order.
+        """
+        if nbClasses is not None and nbClasses < 1:
+            raise ValueError('nbClasses must be 1 or more')
+
+        with self._lock.reading():
+            return self._predictTopClassesWordsCountBatch(wordsCounts, nbClasses, threshold)
+
+    def classifyMany(self, filePaths, workers = None, chunkSize = 16):
+        """
+        Classify many files passed by their paths, spreading them over a pool of
+        worker processes. The classifier is sent once to every worker (inherited
+        by fork when available, pickled once per worker otherwise), never once
+        per file.
+
+        @param filePaths: the file paths of the files to classify.
+        @param workers: the amount of worker processes (default is the amount
+        of CPUs). With 1 worker, files are classified in this process.
+        @param chunkSize: the amount of files sent to a worker at once, to
+        reduce the communication cost of short files (default is 16).
+        @rtype: list
+        @return: the name of the most probable bayes class of every file, in the
+        order of the file paths.
+        """
+        filePaths = list(filePaths)
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if min(workers, len(filePaths)) <= 1:
+            return [self.classify(filePath) for filePath in filePaths]
+
+        return _mapInWorkers(_classifyInWorker, filePaths, workers, self, chunkSize)
+
+    def doCrossValidation(self, filePathsByClass, nbFolds = 10, stratified = True, workers = 1, seed = 0):
+        """
+        Do a cross-validation of the classifier settings with the given files.
+        Every file is read and counted once, then the training of each fold is
+        built from the total count minus the count of the fold files. The
+        training of this classifier is not modified.
+
+        @param filePathsByClass: the dictionary of file paths lists by bayes
+        class name.
+        @param nbFolds: the amount of folds (default is 10).
+        @param stratified: make every fold hold the same share of each class if
+        this argument is True; slice the files of all classes, shuffled,
+        otherwise (default is True).
+        @param workers: the amount of worker processes counting files and
+        running folds (default is 1, everything runs in this process).
+        @param seed: the seed of the random generator shuffling the files when
+        the folds are not stratified (default is 0).
+        @rtype: list
+        @return: one dictionary by fold with the keys 'fold', 'nbTrainingFiles',
+        'nbTestingFiles', 'accuracy', 'classesAccuracy' (accuracy by bayes class
+        name, None without testing file), 'trainingTime' and
+        'classificationTime' (in seconds).
+        """
+        filePaths = [(className, filePath) for className, classFilePaths in filePathsByClass.items() for filePath in classFilePaths]
+
+        if workers > 1:
+            filesWordsCount = _mapInWorkers(_countFileWordsInWorker, [filePath for className, filePath in filePaths], workers, self, 16)
+        else:
+            filesWordsCount = [self._countFileWords(filePath) for className, filePath in filePaths]
+
+        totalWordsCount = defaultdict(Counter)
+
+        for (className, filePath), wordsCount in zip(filePaths, filesWordsCount):
+            totalWordsCount[className].update(wordsCount)
+
+        # Folds hold indexes in the files list
+        if stratified:
+            folds = [[] for i in range(nbFolds)]
+            firstIndex = 0
+
+            for classFilePaths in filePathsByClass.values():
+                nbFiles = len(classFilePaths)
+
+                for i in range(nbFolds):
+                    folds[i].extend(range(firstIndex + nbFiles * i // nbFolds, firstIndex + nbFiles * (i + 1) // nbFolds))
+
+                firstIndex += nbFiles
+        else:
+            # Files are listed class by class: shuffled, every fold mixes them
+            nbFiles = len(filePaths)
+            indexes = list(range(nbFiles))
+            random.Random(seed).shuffle(indexes)
+            folds = [indexes[nbFiles * i // nbFolds:nbFiles * (i + 1) // nbFolds] for i in range(nbFolds)]
+
+        crossValidation = (self, filePaths, filesWordsCount, totalWordsCount, folds)
+
+        if workers > 1:
+            return _mapInWorkers(_doCrossValidationFoldInWorker, range(nbFolds), workers, crossValidation)
+
+        return [_doCrossValidationFold(crossValidation, i) for i in range(nbFolds)]
+
+    def save(self, filePath, floatType = 'd'):
+        """
+        Save the training content and the training of the classifier, with its
+        ignore list, in a compact binary file. The occurrence and the log
+        numerators of every class are stored as contiguous arrays, indexed like
+        the vocabulary table.
+
+        @param filePath: the file path of the model file to write.
+        @param floatType: the array type code of the log numerators, 'd' for
+        float64 or 'f' for float32 (default is 'd').
+        """
+        if floatType not in ('d', 'f'):
+            raise ValueError('floatType must be \'d\' or \'f\'')
+
+        words = self._vocabulary.getWords()
+        vocabularySize = len(words)
+
+        # Written aside then renamed: a process mapping the model, this one
+        # included, keeps reading the old file instead of a truncated one
+        temporaryFilePath = '{0}.{1}.tmp'.format(filePath, os.getpid())
+
+        try:
+            with open(temporaryFilePath, 'wb') as file:
+                file.write(_MODEL_HEADER.pack(MODEL_MAGIC, MODEL_VERSION, self._filesTagged, ord(floatType), len(self._bayesClasses), vocabularySize, self._trainedVocabularySize))
+
+                for bayesClassName, bayesClass in self._bayesClasses.items():
+                    changedWordIds = array('q', sorted(bayesClass.getChangedWordIds()))
+
+                    _writeModelBlock(file, str(bayesClassName).encode('utf-8'))
+                    file.write(_MODEL_CLASS.pack(bayesClass.getNbWords(), bayesClass.getNbDocuments(), bayesClass.getLogDenominator(), bayesClass.getLogPrior(), len(changedWordIds)))
+                    _writeModelArray(file, changedWordIds)
+
+                # Words and ignored words never contain line breaks, hashed
+                # words are not kept
+                _writeModelBlock(file, '\n'.join(words).encode('utf-8') if self._hashSize is None else b'')
+                _writeModelBlock(file, '\n'.join(self._stopwordIndex).encode('utf-8'))
+
+                # Forgotten words are saved as pruned words without occurrence
+                prunedWordIds = self._prunedWordIds | self._forgottenWordIds
+
+                file.write(_MODEL_LENGTH.pack(len(prunedWordIds)))
+                _writeModelArray(file, array('q', sorted(prunedWordIds)))
+
+                file.write(_MODEL_FEATURES.pack(self._nbGrams, self._hashSize is not None))
+                file.write(_MODEL_STOPWORDS.pack(self._stopwordIndex.getFoldCase(), self._stopwordIndex.getFoldAccents(), self._stopwordsOnWordIds))
+
+                # Arrays are aligned on 8 bytes to be mapped as they are
+                file.write(b'\x00' * (-file.tell() % 8))
+
+                for bayesClass in self._bayesClasses.values():
+                    _writeModelArray(file, _resizeArray(array('q', bayesClass.getWordsCount()), vocabularySize))
+
+                for bayesClass in self._bayesClasses.values():
+                    _writeModelArray(file, _resizeArray(array(floatType, bayesClass.getWordsLogNumerator()), vocabularySize))
+
+            os.replace(temporaryFilePath, filePath)
+        except BaseException:
+            try:
+                os.remove(temporaryFilePath)
+            except OSError:
+                pass
+
+            raise
+
+    def load(self, filePath, mmap = True):
+        """
+        Replace the training content, the training and the ignore list of the
+        classifier by the ones saved in a model file by the save method.
+
+        When the file is memory-mapped, the classes and the matrix scoring
+        engine use its arrays in place: processes loading the same model share
+        its pages until they train it again.
+
+        @param filePath: the file path of the model file to read.
+        @param mmap: map the file in memory if this argument is True; read it
+        otherwise (default is True).
+        """
+        with open(filePath, 'rb') as file:
+            if mmap:
+                data = memoryMap(file.fileno(), 0, access = ACCESS_COPY)
+            else:
+                data = file.read()
+
+        magic, version, filesTagged, floatType, nbClasses, vocabularySize, trainedVocabularySize = _MODEL_HEADER.unpack_from(data, 0)
+        offset = _MODEL_HEADER.size
+
+        if magic != MODEL_MAGIC or not 1 <= version <= MODEL_VERSION:
+            raise ValueError('{0} is not a model file of version {1} or older'.format(filePath, MODEL_VERSION))
+
+        floatType = chr(floatType)
+        bayesClassesInfo = []
+
+        for i in range(nbClasses):
+            bayesClassName, offset = _readModelBlock(data, offset)
+
+            if version == 1:
+                # Files of version 1 have no documents, classes are equally
+                # probable
+                nbWords, logDenominator, nbChangedWords = _MODEL_CLASS_VERSION1.unpack_from(data, offset)
+                nbDocuments, logPrior = 0, -log(nbClasses)
+                offset += _MODEL_CLASS_VERSION1.size
+            else:
+                nbWords, nbDocuments, logDenominator, logPrior, nbChangedWords = _MODEL_CLASS.unpack_from(data, offset)
+                offset += _MODEL_CLASS.size
+
+            changedWordIds, offset = _readModelArray(data, offset, 'q', nbChangedWords)
+
+            bayesClassesInfo.append((bayesClassName.decode('utf-8'), nbWords, nbDocuments, logDenominator, logPrior, changedWordIds))
+
+        words, offset = _readModelBlock(data, offset)
+        ignoreList, offset = _readModelBlock(data, offset)
+
+        # Files older than version 3 have no pruned words
+        if version >= 3:
+            nbPrunedWords, = _MODEL_LENGTH.unpack_from(data, offset)
+            prunedWordIds, offset = _readModelArray(data, offset + _MODEL_LENGTH.size, 'q', nbPrunedWords)
+        else:
+            prunedWordIds = ()
+
+        # Files older than version 4 have words only
+        if version >= 4:
+            nbGrams, hashed = _MODEL_FEATURES.unpack_from(data, offset)
+            offset += _MODEL_FEATURES.size
+        else:
+            nbGrams, hashed = 1, False
+
+        # Files older than version 5 have ignore lists without folding, applied
+        # on the words read
+        if version >= 5:
+            foldCase, foldAccents, stopwordsOnWordIds = _MODEL_STOPWORDS.unpack_from(data, offset)
+            offset += _MODEL_STOPWORDS.size
+        else:
+            foldCase, foldAccents, stopwordsOnWordIds = False, False, False
+
+        words = words.decode('utf-8').split('\n') if vocabularySize and not hashed else []
+        offset += -offset % 8
+
+        self._nbGrams = nbGrams
+        self._hashSize = vocabularySize if hashed else None
+        self.emptyTraining()
+        self._filesTagged = bool(filesTagged)
+        self.setStopwordIndex(StopwordIndex(ignoreList.decode('utf-8').split('\n'), bool(foldCase), bool(foldAccents)), bool(stopwordsOnWordIds))
+        self._vocabulary = HashedVocabulary(vocabularySize) if hashed else Vocabulary(words)
+        self._trainedVocabularySize = trainedVocabularySize
+        self._prunedWordIds = set(prunedWordIds)
+        self._pruningOutdated = True
+
+        logNumeratorsOffset = offset + nbClasses * vocabularySize * 8
+
+        for row, (bayesClassName, nbWords, nbDocuments, logDenominator, logPrior, changedWordIds) in enumerate(bayesClassesInfo):
+            wordsCount, offset = _readModelArray(data, offset, 'q', vocabularySize, mmap)
+            wordsLogNumerator = _readModelArray(data, logNumeratorsOffset + row * vocabularySize * array(floatType).itemsize, floatType, vocabularySize, mmap)[0]
+
+            bayesClass = BayesClass(self._vocabulary)
+            bayesClass.setTraining(nbWords, nbDocuments, wordsCount, wordsLogNumerator, logDenominator, logPrior, changedWordIds)
+
+            self._bayesClasses[bayesClassName] = bayesClass
+
+            if hashed:
+                # The added identifiers are the ones counted by a class
+                for wordId, count in enumerate(wordsCount):
+                    if count:
+                        self._vocabulary.addWordId(wordId)
+
+        # Pruned words without occurrence were forgotten; in a hashed
+        # vocabulary, their identifiers are simply not added
+        self._forgottenWordIds = set(wordId for wordId in self._prunedWordIds if not self._isWordCounted(wordId))
+        self._prunedWordIds -= self._forgottenWordIds
+
+        if hashed:
+            self._forgottenWordIds = set()
+
+        if self._useNumpy:
+            # The matrix is a view of the loaded data, copied only when written
+            self._bayesClassesNames = list(self._bayesClasses)
+            self._logNumeratorMatrix = numpy.asarray(numpy.frombuffer(data, numpy.dtype(floatType).newbyteorder('<'), nbClasses * vocabularySize, logNumeratorsOffset).reshape(nbClasses, vocabularySize), order = self._getMatrixOrder())
+            self._logDenominators = numpy.array([bayesClass.getLogDenominator() for bayesClass in self._bayesClasses.values()])
+            self._logPriors = numpy.array([bayesClass.getLogPrior() for bayesClass in self._bayesClasses.values()])
+
+    def _updateProbabilityMatrix(self, changedWordIds, full):
+        """
+        Update the matrix scoring engine with the words computed again by the
+        last training. The matrix has one row per class and one column per
+        vocabulary word, it is rebuilt only when the classes changed.
+
+        @param changedWordIds: the identifiers of the words computed again, by
+        bayes class name.
+        @param full: flag to tell if the matrix must be rebuilt.
+        """
+        vocabularySize = self._trainedVocabularySize
+        order = self._getMatrixOrder()
+
+        if full or self._bayesClassesNames != list(self._bayesClasses):
+            self._bayesClassesNames = list(self._bayesClasses)
+            self._logNumeratorMatrix = numpy.array([numpy.frombuffer(bayesClass.getWordsLogNumerator(), numpy.float64 if bayesClass.getWordsLogNumerator().itemsize == 8 else numpy.float32, vocabularySize) for bayesClass in self._bayesClasses.values()], numpy.float64, order = order).reshape(len(self._bayesClassesNames), vocabularySize, order = order)
+            changedWordIds = {name: () for name in self._bayesClassesNames}
+        elif self._logNumeratorMatrix.shape[1] < vocabularySize:
+            # Grow by doubling to keep the cost of new words amortized
+            capacity = max(vocabularySize, 2 * self._logNumeratorMatrix.shape[1])
+            logNumeratorMatrix = numpy.zeros((len(self._bayesClassesNames), capacity), order = order)
+            logNumeratorMatrix[:, :self._logNumeratorMatrix.shape[1]] = self._logNumeratorMatrix
+            self._logNumeratorMatrix = logNumeratorMatrix
+        elif not self._logNumeratorMatrix.flags.writeable:
+            self._logNumeratorMatrix = self._logNumeratorMatrix.copy(order)
+
+        self._logDenominators = numpy.zeros(len(self._bayesClassesNames))
+        self._logPriors = numpy.zeros(len(self._bayesClassesNames))
+
+        for row, bayesClassName in enumerate(self._bayesClassesNames):
+            bayesClass = self._bayesClasses[bayesClassName]
+            wordsLogNumerator = bayesClass.getWordsLogNumerator()
+            columns = list(changedWordIds[bayesClassName])
+
+            self._logNumeratorMatrix[row, columns] = [wordsLogNumerator[wordId] for wordId in columns]
+            self._logDenominators[row] = bayesClass.getLogDenominator()
+            self._logPriors[row] = bayesClass.getLogPrior()
+
+    def _createTokenizer(self):
+        """
+        Create the tokenizer of the settings of this classifier: it filters the
+        ignored words out unless they are applied on word identifiers.
+
+        @rtype: Tokenizer
+        @return: the tokenizer.
+        """
+        return Tokenizer(self._filesTagged, StopwordIndex() if self._stopwordsOnWordIds else self._stopwordIndex)
+
+    def _createUntrainedCopy(self):
+        """
+        Create a BayesClassifier with the same settings and ignore list as this
+        one, but without training content.
+
+        @rtype: BayesClassifier
+        @return: the untrained copy.
+        """
+        classifier = BayesClassifier(self._filesTagged, self._useNumpy)
+        classifier.setManyClasses(self._manyClasses)
+        classifier.setFeatures(self._nbGrams, self._hashSize)
+        classifier.setStopwordIndex(self._stopwordIndex, self._stopwordsOnWordIds)
+        classifier._unknownWordsPolicy = self._unknownWordsPolicy
+        classifier.setPruning(self._minWordCount, self._maxVocabularySize, self._featureSelection, self._nbSelectedWords)
+        classifier._instrumentation = self._instrumentation
+        classifier._corpusCache = self._corpusCache
+
+        return classifier
+
+    def _countFileWords(self, filePath):
+        """
+        Count the important words of a file passed by his path.
+
+        @param filePath: the file path of the file to read.
+        @rtype: Counter
+        @return: the dictionary of words occurrence.
+        """
+        corpusCache = self._corpusCache
+
+        if corpusCache is not None:
+            key = corpusCache.getKey(filePath, self._filesTagged, self._tokenizer.getStopwordIndex().getFingerprint(), self._nbGrams)
+            wordsCount = corpusCache.get(key)
+
+            if wordsCount is None:
+                wordsCount = self._readFileWords(filePath)
+                corpusCache.put(key, wordsCount)
+
+            return wordsCount
+
+        return self._readFileWords(filePath)
+
+    def _readFileWords(self, filePath):
+        """
+        Read and count the important words of a file passed by his path,
+        without the cache.
+
+        @param filePath: the file path of the file to read.
+        @rtype: Counter
+        @return: the dictionary of words occurrence.
+        """
+        instrumentation = self._instrumentation
+
+        if instrumentation is None:
+            return Counter(self._generateFeatures(self._tokenizer.tokenizeFile(filePath)))
+
+        start = time.perf_counter()
+
+        with open(filePath, 'rb') as file:
+            content = file.read()
+
+        text = content.decode('utf-8')
+        instrumentation.record('read', time.perf_counter() - start, nbFiles = 1, nbBytes = len(content))
+
+        return self._countTextWords(text)
+
+    def _countFilesWords(self, filePaths):
+        """
+        Count the important words of many files passed by their paths, together.
+        Words are kept in order of first appearance.
+
+        @param filePaths: the file paths of the files to read.
+        @rtype: Counter
+        @return: the dictionary of words occurrence.
+        """
+        wordsCount = Counter()
+
+        for filePath in filePaths:
+            wordsCount.update(self._countFileWords(filePath))
+
+        return wordsCount
+
+    def _countTextWords(self, text):
+        """
+        Count the important words of a text held in memory.
+
+        @param text: the text to read (str, or UTF-8 bytes).
+        @rtype: Counter
+        @return: the dictionary of words occurrence.
+        """
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+
+        instrumentation = self._instrumentation
+
+        if instrumentation is None:
+            return Counter(self._generateFeatures(self._tokenizer.tokenize(text)))
+
+        start = time.perf_counter()
+        words = self._tokenizer.tokenize(text)
+        tokenizeTime = time.perf_counter()
+        instrumentation.record('tokenize', tokenizeTime - start, nbTokens = len(words))
+
+        wordsCount = Counter(self._generateFeatures(words))
+        instrumentation.record('count', time.perf_counter() - tokenizeTime)
+
+        return wordsCount
+
+    def _countLinesWords(self, lines):
+        """
+        Count the important words of lines of text.
+
+        @param lines: the iterable of lines to read (str, or UTF-8 bytes).
+        @rtype: Counter
+        @return: the dictionary of words occurrence.
+        """
+        instrumentation = self._instrumentation
+
+        if instrumentation is None:
+            return Counter(self._generateFeatures(self._tokenizer.tokenizeLines(lines)))
+
+        # Reading the lines is part of the tokenization
+        start = time.perf_counter()
+        words = list(self._tokenizer.tokenizeLines(lines))
+        tokenizeTime = time.perf_counter()
+        instrumentation.record('tokenize', tokenizeTime - start, nbTokens = len(words))
+
+        wordsCount = Counter(self._generateFeatures(words))
+        instrumentation.record('count', time.perf_counter() - tokenizeTime)
+
+        return wordsCount
+
+    def _generateFeatures(self, words):
+        """
+        Get the features of words, following the n-grams setting.
+
+        @param words: the iterable of words, in order.
+        @rtype: iterable
+        @return: the words themselves, or an iterator over the words and
+        n-grams.
+        """
+        if self._nbGrams == 1:
+            return words
+
+        return generateNgramsIterator(words, self._nbGrams)
+
+    def _identifyWordsCount(self, wordsCount):
+        """
+        Identify the words of content already counted. Words unknown to the last
+        training, forgotten ones included, are only counted, the vocabulary is
+        never modified.
+
+        @param wordsCount: the dictionary of words occurrence.
+        @rtype: tuple
+        @return: the list of words identifier, the list of their occurrence and
+        the amount of unknown words.
+        """
+        wordsIds = self._vocabulary.getWordsIds()
+        vocabularySize = self._trainedVocabularySize
+        prunedWordIds = self._prunedWordIds
+        forgottenWordIds = self._forgottenWordIds
+        wordIds = []
+        counts = []
+        nbUnknownWords = 0
+        nbUnknownLookups = 0
+
+        for word, count in wordsCount.items():
+            wordId = wordsIds.get(word, vocabularySize)
+
+            if wordId >= vocabularySize or wordId in forgottenWordIds:
+                nbUnknownWords += count
+                nbUnknownLookups += 1
+            elif wordId not in prunedWordIds:
+                wordIds.append(wordId)
+                counts.append(count)
+
+        if self._instrumentation is not None:
+            self._instrumentation.addCounts(nbLookups = len(wordsCount), nbUnknownLookups = nbUnknownLookups)
+
+        return wordIds, counts, nbUnknownWords
+
+    def _isWordCounted(self, wordId):
+        """
+        Tell if a word occurs in a class.
+
+        @param wordId: the identifier of the word.
+        @rtype: bool
+        @return: True if a class counts the word.
+        """
+        for bayesClass in self._bayesClasses.values():
+            wordsCount = bayesClass.getWordsCount()
+
+            if wordId < len(wordsCount) and wordsCount[wordId]:
+                return True
+
+        return False
+
+    def _updatePrunedWordIds(self, changedWordIds):
+        """
+        Update in place the pruned words among the words changed since the last
+        training: their occurrence is compared to the minimum, the rankings
+        are not computed again. The classes follow the change.
+
+        @param changedWordIds: the identifiers of the changed words.
+        """
+        classesWordsCount = [bayesClass.getWordsCount() for bayesClass in self._bayesClasses.values()]
+        prunedWordIds = self._prunedWordIds
+        selectedWordIds = self._selectedWordIds
+        minWordCount = self._minWordCount
+        addedWordIds = []
+        removedWordIds = []
+
+        for wordId in changedWordIds:
+            if wordId in self._stopwordIds:
+                pruned = True
+            else:
+                totalCount = sum([wordsCount[wordId] for wordsCount in classesWordsCount if wordId < len(wordsCount)])
+                pruned = totalCount > 0 and (totalCount < minWordCount or (selectedWordIds is not None and wordId not in selectedWordIds))
+
+            if pruned and wordId not in prunedWordIds:
+                addedWordIds.append(wordId)
+            elif not pruned and wordId in prunedWordIds:
+                removedWordIds.append(wordId)
+
+        prunedWordIds.update(addedWordIds)
+        prunedWordIds.difference_update(removedWordIds)
+
+        for bayesClass in self._bayesClasses.values():
+            bayesClass.updatePrunedWordIds(prunedWordIds, addedWordIds, removedWordIds)
+
+    def _selectPrunedWordIds(self, vocabularySize):
+        """
+        Select the vocabulary words to prune, following the pruning settings.
+        The words kept by the rankings are recorded for the incremental
+        trainings.
+
+        @param vocabularySize: the size of the vocabulary.
+        @rtype: frozenset
+        @return: the identifiers of the pruned words.
+        """
+        selectFeatures = self._featureSelection is not None and self._nbSelectedWords is not None
+        self._selectedWordIds = None
+
+        if self._minWordCount <= 1 and self._maxVocabularySize is None and not selectFeatures:
+            return frozenset()
+
+        classesWordsCount = [_resizeArray(bayesClass.getWordsCount(), vocabularySize) for bayesClass in self._bayesClasses.values()]
+        totalWordsCount = [sum(wordCounts) for wordCounts in zip(*classesWordsCount)] if classesWordsCount else [0] * vocabularySize
+
+        keptWordIds = [wordId for wordId, count in enumerate(totalWordsCount) if count >= self._minWordCount]
+
+        if self._maxVocabularySize is not None and len(keptWordIds) > self._maxVocabularySize:
+            keptWordIds = sorted(keptWordIds, key = lambda wordId: -totalWordsCount[wordId])[:self._maxVocabularySize]
+            self._selectedWordIds = set(keptWordIds)
+
+        if selectFeatures and len(keptWordIds) > self._nbSelectedWords:
+            classesNbWords = [sum(wordsCount) for wordsCount in classesWordsCount]
+            computeScore = _computeMutualInformation if self._featureSelection == FEATURE_SELECTION_MUTUAL_INFORMATION else _computeChiSquare
+            scores = {wordId: computeScore([wordsCount[wordId] for wordsCount in classesWordsCount], classesNbWords) for wordId in keptWordIds}
+
+            keptWordIds = sorted(keptWordIds, key = lambda wordId: -scores[wordId])[:self._nbSelectedWords]
+            self._selectedWordIds = set(keptWordIds)
+
+        keptWordIds = set(keptWordIds)
+
+        # Identifiers never added to a hashed vocabulary are not words to prune
+        return frozenset(wordId for wordId in range(vocabularySize) if wordId not in keptWordIds and totalWordsCount[wordId])
+
+    def _classifyWordsCountBatch(self, wordsCounts):
+        """
+        Classify a batch of contents already counted, without the lock. See the
+        classifyWordsCountBatch method.
+
+        @param wordsCounts: the dictionaries of words occurrence to classify.
+        @rtype: list
+        @return: the name of the most probable bayes class of every content, in
+        order.
+        """
+        if self._logNumeratorMatrix is None:
+            classesLogLikelihoods = [self._computeLogLikelihoods(wordsCount) for wordsCount in wordsCounts]
+
+            return [max(logLikelihoods, key = logLikelihoods.get) for logLikelihoods in classesLogLikelihoods]
+
+        logLikelihoods = self._computeLogLikelihoodsBatchWithMatrix(wordsCounts)
+
+        return [self._bayesClassesNames[row] for row in numpy.argmax(logLikelihoods, 0).tolist()]
+
+    def _predictTopClassesWordsCountBatch(self, wordsCounts, nbClasses, threshold):
+        """
+        Get the most probable classes of a batch of contents already counted,
+        without the lock. See the predictTopClassesWordsCountBatch method.
+
+        @param wordsCounts: the dictionaries of words occurrence to score.
+        @param nbClasses: the maximum amount of classes by content, None for no
+        limit.
+        @param threshold: the minimum probability of the classes, a dictionary
+        by bayes class name, or None.
+        @rtype: list
+        @return: the list of (bayes class name, probability) of every content.
+        """
+        bayesClassesNames = list(self._bayesClasses) if self._logNumeratorMatrix is None else self._bayesClassesNames
+
+        if isinstance(threshold, dict):
+            thresholds = [threshold.get(bayesClassName, 0.0) for bayesClassName in bayesClassesNames]
+        else:
+            thresholds = [threshold or 0.0] * len(bayesClassesNames)
+
+        if self._logNumeratorMatrix is None:
+            thresholds = dict(zip(bayesClassesNames, thresholds))
+            topClasses = []
+
+            for wordsCount in wordsCounts:
+                logLikelihoods = self._computeLogLikelihoods(wordsCount)
+                probabilities = _normalizeLogScores({bayesClassName: logLikelihood + self._bayesClasses[bayesClassName].getLogPrior() for bayesClassName, logLikelihood in logLikelihoods.items()})
+                classes = sorted(probabilities, key = probabilities.get, reverse = True)[:nbClasses]
+
+                topClasses.append([(bayesClassName, probabilities[bayesClassName]) for bayesClassName in classes if probabilities[bayesClassName] >= thresholds[bayesClassName]])
+
+            return topClasses
+
+        thresholds = numpy.array(thresholds)
+
+        # Probabilities of the classes (rows) for every content (columns), with
+        # log-sum-exp
+        logScores = self._computeLogLikelihoodsBatchWithMatrix(wordsCounts) + self._logPriors[:, numpy.newaxis]
+        probabilitiesMatrix = numpy.exp(logScores - logScores.max(0))
+        probabilitiesMatrix /= probabilitiesMatrix.sum(0)
+
+        topClasses = []
+
+        for probabilities in probabilitiesMatrix.T:
+            # Only the nbClasses best classes are sorted
+            if nbClasses is not None and nbClasses < len(probabilities):
+                rows = numpy.argpartition(-probabilities, nbClasses - 1)[:nbClasses]
+            else:
+                rows = numpy.arange(len(probabilities))
+
+            rows = rows[numpy.argsort(-probabilities[rows], kind = 'stable')]
+            rows = rows[probabilities[rows] >= thresholds[rows]]
+
+            topClasses.append([(bayesClassesNames[row], float(probabilities[row])) for row in rows.tolist()])
+
+        return topClasses
+
+    def _computeLogLikelihoodsBatchWithMatrix(self, wordsCounts):
+        """
+        Compute the log likelihood of a batch of contents already counted with
+        the matrix scoring engine, by a single matrix product over the words of
+        the batch.
+
+        @param wordsCounts: the dictionaries of words occurrence.
+        @rtype: numpy.ndarray
+        @return: the log likelihoods, one row by bayes class and one column by
+        content.
+        """
+        instrumentation = self._instrumentation
+
+        if instrumentation is not None:
+            start = time.perf_counter()
+
+        identifiedWordsCounts = [self._identifyWordsCount(wordsCount) for wordsCount in wordsCounts]
+        columns = sorted(set(wordId for wordIds, counts, nbUnknownWords in identifiedWordsCounts for wordId in wordIds))
+        rows = {wordId: row for row, wordId in enumerate(columns)}
+
+        # Occurrence of the batch words (rows) in every content (columns)
+        countsMatrix = numpy.zeros((len(columns), len(identifiedWordsCounts)))
+        nbWords = numpy.zeros(len(identifiedWordsCounts))
+
+        for column, (wordIds, counts, nbUnknownWords) in enumerate(identifiedWordsCounts):
+            countsMatrix[[rows[wordId] for wordId in wordIds], column] = counts
+            nbWords[column] = sum(counts)
+
+            if self._unknownWordsPolicy == UNKNOWN_WORDS_LAPLACE:
+                nbWords[column] += nbUnknownWords
+
+        self._nbUnknownWords.add(sum(nbUnknownWords for wordIds, counts, nbUnknownWords in identifiedWordsCounts))
+
+        logLikelihoods = self._logNumeratorMatrix[:, columns].dot(countsMatrix) - numpy.outer(self._logDenominators, nbWords)
+
+        if instrumentation is not None:
+            instrumentation.record('score', time.perf_counter() - start, nbScorings = len(wordsCounts))
+
+        return logLikelihoods
+
+    def _computeLogLikelihoods(self, wordsCount):
+        """
+        Compute the log likelihood of content already counted for every trained
+        class, following the unknown words policy.
+
+        @param wordsCount: the dictionary of words occurrence.
+        @rtype: dict
+        @return: the log likelihood by bayes class name.
+        """
+        instrumentation = self._instrumentation
+
+        if instrumentation is not None:
+            start = time.perf_counter()
+
+        wordIds, counts, nbUnknownWords = self._identifyWordsCount(wordsCount)
+        nbWords = sum(counts)
+
+        self._nbUnknownWords.add(nbUnknownWords)
+
+        if self._unknownWordsPolicy == UNKNOWN_WORDS_LAPLACE:
+            # An unknown word weighs log(1) - log denominator in every class
+            nbWords += nbUnknownWords
+
+        if self._logNumeratorMatrix is not None:
+            logLikelihoods = self._computeLogLikelihoodsWithMatrix(wordIds, counts, nbWords)
+        else:
+            logLikelihoods = {}
+
+            for bayesClassName, bayesClass in self._bayesClasses.items():
+                wordsLogNumerator = bayesClass.getWordsLogNumerator()
+
+                logLikelihoods[bayesClassName] = sum([count * wordsLogNumerator[wordId] for wordId, count in zip(wordIds, counts)]) - nbWords * bayesClass.getLogDenominator()
+
+        if instrumentation is not None:
+            instrumentation.record('score', time.perf_counter() - start, nbScorings = 1)
+
+        return logLikelihoods
+
+    def _getMaxWordSpread(self):
+        """
+        Get the largest gap between the log probabilities of a word in two
+        classes, which bounds how much a single word can change the lead of a
+        class. It is computed once by training.
+
+        @rtype: float
+        @return: the largest gap a word makes between two classes.
+        """
+        if self._maxWordSpread is not None:
+            return self._maxWordSpread
+
+        vocabularySize = self._trainedVocabularySize
+
+        if self._logNumeratorMatrix is not None:
+            logDenominators = self._logDenominators
+            logProbabilityMatrix = self._logNumeratorMatrix[:, :vocabularySize] - logDenominators[:, numpy.newaxis]
+            maxWordSpread = float((logProbabilityMatrix.max(0) - logProbabilityMatrix.min(0)).max()) if vocabularySize else 0.0
+        else:
+            bayesClasses = list(self._bayesClasses.values())
+            logDenominators = [bayesClass.getLogDenominator() for bayesClass in bayesClasses]
+            maxWordSpread = 0.0
+
+            for wordId in range(vocabularySize):
+                logProbabilities = [bayesClass.getWordsLogNumerator()[wordId] - logDenominator for bayesClass, logDenominator in zip(bayesClasses, logDenominators)]
+                maxWordSpread = max(maxWordSpread, max(logProbabilities) - min(logProbabilities))
+
+        if self._unknownWordsPolicy == UNKNOWN_WORDS_LAPLACE and len(logDenominators):
+            maxWordSpread = max(maxWordSpread, float(max(logDenominators) - min(logDenominators)))
+
+        self._maxWordSpread = maxWordSpread
+
+        return maxWordSpread
+
+    def _dropProbabilityMatrix(self):
+        """
+        Drop the matrix scoring engine, the classes arrays will be used instead.
+        """
+        self._bayesClassesNames = []
+        self._logNumeratorMatrix = None
+        self._logDenominators = None
+        self._logPriors = None
+
+    def _getMatrixOrder(self):
+        """
+        Get the memory layout of the matrix scoring engine: row by row ('C'), or
+        column by column ('F') in the many classes mode.
+
+        @rtype: str
+        @return: the NumPy order of the matrix.
+        """
+        return 'F' if self._manyClasses else 'C'
+
+    def _computeLogLikelihoodsWithMatrix(self, wordIds, counts, nbWords):
+        """
+        Compute the log likelihood of identified content with the matrix scoring
+        engine. The matrix columns of the words are multiplied by their
+        occurrence.
+
+        @param wordIds: the list of words identifier.
+        @param counts: the list of words occurrence.
+        @param nbWords: the amount of words weighing the log denominators.
+        @rtype: dict
+        @return: the log likelihood by bayes class name.
+        """
+        logLikelihoods = self._logNumeratorMatrix[:, wordIds].dot(counts) - nbWords * self._logDenominators
+
+        return dict(zip(self._bayesClassesNames, logLikelihoods.tolist()))
+
+#------------------------------------------------------------------------------#
+#                                                                              #
+#                             UTILITIES FUNCTIONS                              #
+#                                                                              #
+#------------------------------------------------------------------------------#
+
+# State shared with the worker processes of _mapInWorkers
+_workerState = None
+
+def _initWorker(state):
+    """
+    Initialize a worker process of _mapInWorkers when it is not forked from the
+    main process.
+
+    @param state: the state to share with this worker.
+    """
+    global _workerState
+
+    _workerState = state
+
+def _mapInWorkers(function, iterable, workers, state, chunkSize = 1):
+    """
+    Map a function over an iterable in a pool of worker processes. The state is
+    sent once to every worker, inherited by fork when available and pickled
+    once per worker otherwise; the function reads it from _workerState.
+
+    @param function: the module level function to call for every item.
+    @param iterable: the items to give to the function.
+    @param workers: the amount of worker processes.
+    @param state: the state to share with the workers.
+    @param chunkSize: the amount of items sent to a worker at once (default is
+    1).
+    @rtype: list
+    @return: the results of the function, in the order of the items.
+    """
+    global _workerState
+
+    if 'fork' in multiprocessing.get_all_start_methods():
+        # Workers inherit the state from this process memory
+        _workerState = state
+        executor = ProcessPoolExecutor(workers, multiprocessing.get_context('fork'))
+    else:
+        executor = ProcessPoolExecutor(workers, initializer = _initWorker, initargs = (state,))
+
+    try:
+        with executor:
+            return list(executor.map(function, iterable, chunksize = max(1, chunkSize)))
+    finally:
+        _workerState = None
+
+def _classifyInWorker(filePath):
+    """
+    Classify a file in a worker process of BayesClassifier.classifyMany.
+
+    @param filePath: the file path of the file to classify.
+    @rtype: str
+    @return: the name of the most probable bayes class.
+    """
+    return _workerState.classify(filePath)
+
+def _countFileWordsInWorker(filePath):
+    """
+    Count the important words of a file in a worker process of
+    BayesClassifier.doCrossValidation.
+
+    @param filePath: the file path of the file to read.
+    @rtype: Counter
+    @return: the dictionary of words occurrence.
+    """
+    return _workerState._countFileWords(filePath)
+
+def _countFilesWordsInWorker(filePaths):
+    """
+    Count the important words of a shard of files in a worker process of
+    BayesClassifier.trainParallel.
+
+    @param filePaths: the file paths of the files to read.
+    @rtype: Counter
+    @return: the dictionary of words occurrence.
+    """
+    return _workerState._countFilesWords(filePaths)
+
+def _doCrossValidationFoldInWorker(foldIndex):
+    """
+    Run a fold in a worker process of BayesClassifier.doCrossValidation.
+
+    @param foldIndex: the index of the fold to run.
+    @rtype: dict
+    @return: the fold results.
+    """
+    return _doCrossValidationFold(_workerState, foldIndex)
+
+def _doCrossValidationFold(crossValidation, foldIndex):
+    """
+    Run a fold of BayesClassifier.doCrossValidation: train a copy of the
+    classifier with the total count minus the fold files count, then classify
+    the fold files.
+
+    @param crossValidation: the tuple of the classifier, the files list, the
+    files words count, the total words count by bayes class name and the folds.
+    @param foldIndex: the index of the fold to run.
+    @rtype: dict
+    @return: the fold results.
+    """
+    classifier, filePaths, filesWordsCount, totalWordsCount, folds = crossValidation
+    testingIndexes = folds[foldIndex]
+
+    trainingStart = time.perf_counter()
+
+    trainingWordsCount = {className: Counter(wordsCount) for className, wordsCount in totalWordsCount.items()}
+    trainingNbDocuments = Counter(className for className, filePath in filePaths)
+
+    for index in testingIndexes:
+        trainingWordsCount[filePaths[index][0]].subtract(filesWordsCount[index])
+        trainingNbDocuments[filePaths[index][0]] -= 1
+
+    foldClassifier = classifier._createUntrainedCopy()
+
+    for className, wordsCount in trainingWordsCount.items():
+        # Unary plus drops the words left without occurrence
+        foldClassifier.addTrainingWordsCount(className, +wordsCount, trainingNbDocuments[className])
+
+    foldClassifier.doTraining()
+
+    classificationStart = time.perf_counter()
+
+    classesCount = Counter()
+    classesFound = Counter()
+
+    for index in testingIndexes:
+        className = filePaths[index][0]
+        classesCount[className] += 1
+
+        if foldClassifier.classifyWordsCount(filesWordsCount[index]) == className:
+            classesFound[className] += 1
+
+    classificationEnd = time.perf_counter()
+
+    nbTestingFiles = len(testingIndexes)
+
+    return {
+        'fold': foldIndex,
+        'nbTrainingFiles': len(filePaths) - nbTestingFiles,
+        'nbTestingFiles': nbTestingFiles,
+        'accuracy': float(sum(classesFound.values())) / nbTestingFiles if nbTestingFiles else None,
+        'classesAccuracy': {className: float(classesFound[className]) / classesCount[className] if classesCount[className] else None for className in totalWordsCount},
+        'trainingTime': classificationStart - trainingStart,
+        'classificationTime': classificationEnd - classificationStart
+    }
+
+# StopwordIndex objects loaded by loadStopwordIndex, by file and options
+_loadedStopwordIndexes = {}
+
+def loadStopwordIndex(filePath, foldCase = True, foldAccents = False):
+    """
+    Load a StopwordIndex from an ignore list file, one word by line. The index
+    is built once by file and options: while the file is not modified, every
+    call returns the same StopwordIndex.
+
+    @param filePath: the file path of the ignore list.
+    @param foldCase: ignore the words whatever their case if this argument is
+    True (default is True).
+    @param foldAccents: ignore the words whatever their accents if this
+    argument is True (default is False).
+    @rtype: StopwordIndex
+    @return: the StopwordIndex.
+    """
+    fileStat = os.stat(filePath)
+    key = (os.path.abspath(filePath), fileStat.st_mtime_ns, fileStat.st_size, foldCase, foldAccents)
+    stopwordIndex = _loadedStopwordIndexes.get(key)
+
+    if stopwordIndex is None:
+        with open(filePath, encoding = 'utf-8') as file:
+            # Axiom: 1 line = 1 word
+            stopwordIndex = _loadedStopwordIndexes[key] = StopwordIndex(file.read().split('\n'), foldCase, foldAccents)
+
+    return stopwordIndex
+
+def getIgnoreListFingerprint(ignoreList):
+    """
+    Get a fingerprint of an ignore list, the same in every process and for
+    every order of its words.
+
+    @param ignoreList: the set of words to ignore.
+    @rtype: str
+    @return: the fingerprint.
+    """
+    return hashlib.sha1('\n'.join(sorted(ignoreList)).encode('utf-8')).hexdigest()
+
+@lru_cache(maxsize = STOPWORDS_MEMO_SIZE)
+def _stripAccents(word):
+    """
+    Strip the accents of a word, remembering the last words stripped.
+
+    @param word: the word to strip.
+    @rtype: str
+    @return: the word without accents.
+    """
+    return ''.join(character for character in unicodedata.normalize('NFKD', word) if not unicodedata.combining(character))
+
+def _computeMutualInformation(wordCounts, classesNbWords):
+    """
+    Compute the mutual information between the occurrence of a word and the
+    classes, over the words of every class.
+
+    @param wordCounts: the occurrence of the word in every class.
+    @param classesNbWords: the amount of words of every class.
+    @rtype: float
+    @return: the mutual information.
+    """
+    nbWords = float(sum(classesNbWords))
+    nbWordOccurrences = sum(wordCounts)
+    nbOtherWords = nbWords - nbWordOccurrences
+    mutualInformation = 0.0
+
+    for count, classNbWords in zip(wordCounts, classesNbWords):
+        otherCount = classNbWords - count
+
+        if count:
+            mutualInformation += count / nbWords * log(count * nbWords / (nbWordOccurrences * classNbWords))
+
+        if otherCount:
+            mutualInformation += otherCount / nbWords * log(otherCount * nbWords / (nbOtherWords * classNbWords))
+
+    return mutualInformation
+
+def _computeChiSquare(wordCounts, classesNbWords):
+    """
+    Compute the chi-square statistic of the occurrence of a word against the
+    classes, over the words of every class.
+
+    @param wordCounts: the occurrence of the word in every class.
+    @param classesNbWords: the amount of words of every class.
+    @rtype: float
+    @return: the chi-square statistic.
+    """
+    nbWords = float(sum(classesNbWords))
+    nbWordOccurrences = sum(wordCounts)
+    nbOtherWords = nbWords - nbWordOccurrences
+    chiSquare = 0.0
+
+    for count, classNbWords in zip(wordCounts, classesNbWords):
+        expectedCount = nbWordOccurrences * classNbWords / nbWords
+        expectedOtherCount = nbOtherWords * classNbWords / nbWords
+
+        if expectedCount:
+            chiSquare += (count - expectedCount) ** 2 / expectedCount
+
+        if expectedOtherCount:
+            chiSquare += (classNbWords - count - expectedOtherCount) ** 2 / expectedOtherCount
+
+    return chiSquare
+
+def _normalizeLogScores(logScores):
+    """
+    Normalize log scores into probabilities with the log-sum-exp trick, which
+    keeps the exponentials in the float range.
+
+    @param logScores: the dictionary of log scores.
+    @rtype: dict
+    @return: the dictionary of probabilities, summing to 1.
+    """
+    if not logScores:
+        return {}
+
+    maxLogScore = max(logScores.values())
+
+    if maxLogScore == float('-inf'):
+        return {key: 1.0 / len(logScores) for key in logScores}
+
+    logTotal = maxLogScore + log(sum(exp(logScore - maxLogScore) for logScore in logScores.values()))
+
+    return {key: exp(logScore - logTotal) for key, logScore in logScores.items()}
+
+def _writeModelBlock(file, block):
+    """
+    Write a block of bytes preceded by its length in a model file.
+
+    @param file: the model file opened in binary mode.
+    @param block: the bytes to write.
+    """
+    file.write(_MODEL_LENGTH.pack(len(block)))
+    file.write(block)
+
+def _readModelBlock(data, offset):
+    """
+    Read a block of bytes preceded by its length in model data.
+
+    @param data: the model data.
+    @param offset: the offset of the block length.
+    @rtype: tuple
+    @return: the bytes read and the offset following them.
+    """
+    length, = _MODEL_LENGTH.unpack_from(data, offset)
+    offset += _MODEL_LENGTH.size
+
+    return bytes(data[offset:offset + length]), offset + length
+
+def _toArray(values):
+    """
+    Get an array from array-like values, like a memoryview mapped from a model
+    file, copying them only when they are not an array.
+
+    @param values: the array-like values.
+    @rtype: array
+    @return: the array.
+    """
+    if isinstance(values, array):
+        return values
+
+    return array(values.format, values)
+
+def _resizeArray(values, length):
+    """
+    Grow an array with zeros up to a length. Values mapped from a model file are
+    copied to an array first.
+
+    @param values: the array-like values.
+    @param length: the length to reach.
+    @rtype: array
+    @return: the array of at least this length.
+    """
+    if len(values) >= length:
+        return values
+
+    values = _toArray(values)
+    values.frombytes(bytes((length - len(values)) * values.itemsize))
+
+    return values
+
+def _writeModelArray(file, values):
+    """
+    Write an array in a model file, in little-endian order.
+
+    @param file: the model file opened in binary mode.
+    @param values: the array to write.
+    """
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+
+    file.write(values.tobytes())
+
+def _readModelArray(data, offset, typeCode, length, inPlace = False):
+    """
+    Read an array written in little-endian order in model data.
+
+    @param data: the model data.
+    @param offset: the offset of the array.
+    @param typeCode: the array type code.
+    @param length: the amount of values.
+    @param inPlace: return a memoryview of the data instead of a copy when the
+    byte order allows it (default is False).
+    @rtype: tuple
+    @return: the array read and the offset following it.
+    """
+    values = array(typeCode)
+    end = offset + length * values.itemsize
+
+    if inPlace and sys.byteorder == 'little':
+        return memoryview(data)[offset:end].cast(typeCode), end
+
+    values.frombytes(data[offset:end])
+
+    if sys.byteorder != 'little':
+        values.byteswap()
+
+    return values, end
+
+def generateFileIterator(filePath, fileTagged, ignoreList = frozenset()):
+    """
     Generate an iterator to get every important word in a file. A word is
     important when it is not a punctuation and not in the ignore list. In
     addition, when the file is tagged, it ignores names.
 
     @param filePath: the file path of the file to read.
     @param fileTagged: flag to tell if the file is tagged or not.
-    @param ignoreList: list of words to ignore (default empty list).
+    @param ignoreList: StopwordIndex, or set of lowercase words to ignore
+    (default is empty).
     """
-    if fileTagged:
-        with open(filePath, encoding = 'utf-8') as file:
-            for line in file:
-                # Axiom: 1 line = 3 words separate by whitespace
-                # Axiom: wordInfo[0] = original form
-                # Axiom: wordInfo[1] = word type
-                # Axiom: wordInfo[2] = primitive form
-                wordInfo = line.strip().split()
-
-                # Check axioms
-                if len(wordInfo) == 3:
-                    # Ignore words in ignore list, punctuation and names
-                    if wordInfo[2] not in ignoreList and \
-                       wordInfo[1] != 'PUN' and \
-                       wordInfo[1] != 'SENT' and \
-                       wordInfo[1] != 'NAM':
-                        yield wordInfo[2]
-    else:        
-        with open(filePath, encoding = 'utf-8') as file:
-            # Prepare a translation table for punctuation removal
-            noPunctuationTranstable = str.maketrans('', '', string.punctuation)
-            
-            for line in file:
-                # Remove punctuation
-                line = line.translate(noPunctuationTranstable)
-
-                # Split line into words array and remove whitespaces
-                words = line.strip().split()
-                
-                for word in words:
-                    # Ignore words in ignore list
-                    if word not in ignoreList:
-                        yield word.lower()
+    yield from Tokenizer(fileTagged, ignoreList).tokenizeFile(filePath)
+
+def generateLinesIterator(lines, linesTagged, ignoreList = frozenset()):
+    """
+    Generate an iterator to get every important word in lines of text, like
+    generateFileIterator does with a file.
+
+    @param lines: the iterable of lines to read (str, or UTF-8 bytes).
+    @param linesTagged: flag to tell if the lines are tagged or not.
+    @param ignoreList: StopwordIndex, or set of lowercase words to ignore
+    (default is empty).
+    """
+    return Tokenizer(linesTagged, ignoreList).tokenizeLines(lines)
+
+def generateNgramsIterator(words, nbGrams):
+    """
+    Generate an iterator over words and their n-grams: every word is followed
+    by the n-grams ending with it, from 2 up to nbGrams words, joined by
+    spaces.
+
+    @param words: the iterable of words, in order.
+    @param nbGrams: the maximum amount of words of the n-grams.
+    """
+    window = deque(maxlen = nbGrams)
+
+    for word in words:
+        window.append(word)
+        ngram = word
+
+        yield word
+
+        for i in range(2, len(window) + 1):
+            ngram = window[-i] + ' ' + ngram
+
+            yield ngram
+
+def generateDocumentsIterator(stream, delimiter, chunkSize = 65536):
+    """
+    Generate an iterator to get the documents of a stream holding many documents
+    separated by a delimiter. The stream is read by chunks, so only the current
+    document is held in memory.
+
+    @param stream: the file-like object to read, in text or binary (UTF-8)
+    mode.
+    @param delimiter: the string separating two documents.
+    @param chunkSize: the amount of characters or bytes read at once (default
+    is 65536).
+    """
+    decoder = None
+    documentParts = []
+    tail = ''
+
+    while True:
+        chunk = stream.read(chunkSize)
+
+        if not chunk:
+            break
+
+        if isinstance(chunk, bytes):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder('utf-8')()
+
+            chunk = decoder.decode(chunk)
+
+        documents = (tail + chunk).split(delimiter)
+        tail = documents.pop()
+
+        if documents:
+            documents[0] = ''.join(documentParts) + documents[0]
+            documentParts = []
+
+            yield from documents
+
+        # Keep enough characters to find a delimiter across two chunks
+        cut = len(tail) - len(delimiter) + 1
+
+        if cut > 0:
+            documentParts.append(tail[:cut])
+            tail = tail[cut:]
+
+    if decoder is not None:
+        tail += decoder.decode(b'', True)
+
+    document = ''.join(documentParts) + tail
+
+    # A delimiter closing the stream does not open a last document
+    if document:
+        yield document
+
+def _generateDecodedLines(lines):
+    """
+    Generate an iterator to get lines of text as str, decoding UTF-8 bytes.
+
+    @param lines: the iterable of lines to read (str, or UTF-8 bytes).
+    """
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+
+        yield line
 
 #------------------------------------------------------------------------------#
 #                                                                              #
@@ -259,52 +3663,14 @@ if __name__ == '__main__':
 #------------------------------------------------------------------------------#
 
     def doCrossValidation(classifier, positiveFilePathsList, negativeFilePathsList):
-        for i in range(10):
-            startSlice = int(len(positiveFilePathsList) * 0.1 * i)
-            endSlice = int(len(positiveFilePathsList) * 0.1 * (i + 1))
-
-            positiveFilePathsListForTesting = positiveFilePathsList[startSlice:endSlice]
-            negativeFilePathsListForTesting = negativeFilePathsList[startSlice:endSlice]
-
-            positiveFilePathsListForTraining = list(set(positiveFilePathsList) - set(positiveFilePathsListForTesting))
-            negativeFilePathsListForTraining = list(set(negativeFilePathsList) - set(negativeFilePathsListForTesting))
-        
-            print('    -> STARTING TRAINING {0}...'.format(i + 1), end = '')
-            for filePath in positiveFilePathsListForTraining:
-                myClassifier.addTrainingContent('positive', filePath)
-
-            for filePath in negativeFilePathsListForTraining:
-                myClassifier.addTrainingContent('negative', filePath)
-
-            myClassifier.doTraining()
-            print(' DONE')
-
-            print('    [CLASSIFICATION {0} STARTED]'.format(i + 1))
-            positivesCount = 0
-            positivesFound = 0
-            
-            negativesCount = 0
-            negativesFound = 0
-
-            for filePath in positiveFilePathsListForTesting:
-                positivesCount += 1
-                
-                if myClassifier.classify(filePath) == 'positive':
-                    positivesFound += 1
-
-            for filePath in negativeFilePathsListForTesting:
-                negativesCount += 1
-                
-                if myClassifier.classify(filePath) == 'negative':
-                    negativesFound += 1
-
-            print('      -> POSITIVES FOUND: {:.2%}'.format((float(positivesFound) / float(positivesCount))))
-            print('      -> NEGATIVES FOUND: {:.2%}'.format((float(negativesFound) / float(negativesCount))))
-
-            # Reset training
-            myClassifier.emptyTraining()
-            
-            print('    [CLASSIFICATION {0} ENDED]'.format(i + 1))
+        folds = classifier.doCrossValidation({'positive': positiveFilePathsList, 'negative': negativeFilePathsList})
+
+        for fold in folds:
+            print('    [CLASSIFICATION {0}]'.format(fold['fold'] + 1))
+            print('      -> TRAINING TIME: {:.3f}s'.format(fold['trainingTime']))
+            print('      -> CLASSIFICATION TIME: {:.3f}s'.format(fold['classificationTime']))
+            print('      -> POSITIVES FOUND: {:.2%}'.format(fold['classesAccuracy']['positive']))
+            print('      -> NEGATIVES FOUND: {:.2%}'.format(fold['classesAccuracy']['negative']))
 
 #------------------------------------------------------------------------------#
 #                                                                              #
@@ -0,0 +1,484 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+
+#------------------------------------------------------------------------------#
+# Classification service of the Bayes classifier                               #
+# ============================================================================ #
+# Organization: HE-Arc Engineering                                             #
+# Developer(s): Danick Fort                                                    #
+#               Dany Jupille                                                   #
+#                                                                              #
+# Filename:     server.py                                                      #
+# Description:  An asyncio server classifying texts sent over TCP or a Unix    #
+#               socket with a trained model. Concurrent requests are grouped   #
+#               in micro-batches scored at once.                               #
+# Version:      1.0                                                            #
+#------------------------------------------------------------------------------#
+
+#------------------------------------------------------------------------------#
+#                                                                              #
+# ------------------------------ GLOBAL SECTION ------------------------------ #
+#                                                                              #
+#------------------------------------------------------------------------------#
+
+#------------------------------------------------------------------------------#
+#                                                                              #
+#                               LIBRARIES IMPORT                               #
+#                                                                              #
+#------------------------------------------------------------------------------#
+
+import argparse
+import asyncio
+import struct
+import time
+
+from collections import deque
+
+from classifier import BayesClassifier
+
+#------------------------------------------------------------------------------#
+#                                                                              #
+#                                  CONSTANTS                                   #
+#                                                                              #
+#------------------------------------------------------------------------------#
+
+# Protocol: every request and every response is a frame made of its length on
+# 4 bytes (big-endian) followed by UTF-8 text. A request holds a text to
+# classify, its response holds the bayes class name, or an error message when
+# the high bit of the length is set.
+_FRAME_LENGTH = struct.Struct('!I')
+_FRAME_ERROR = 0x80000000
+
+# Amount of latest latencies the statistics percentiles are computed on
+LATENCY_WINDOW_SIZE = 10000
+
+# Default maximum length in bytes of the text of a request
+MAX_REQUEST_SIZE = 2 ** 20
+
+#------------------------------------------------------------------------------#
+#                                                                              #
+#                                   CLASSES                                    #
+#                                                                              #
+#------------------------------------------------------------------------------#
+
+class ClassificationError(Exception):
+    """
+    ClassificationError exceptions are raised by ClassificationClient objects
+    when the server could not classify a text.
+    """
+
+class ClassificationServer(object):
+    """
+    ClassificationServer objects serve a trained BayesClassifier. Requests
+    received while a batch is being built join it, until it reaches its maximum
+    size or its oldest request waited the maximum time; the batch is then
+    classified at once in a worker thread. A request which cannot be classified
+    gets an error response, without failing the other requests of its batch.
+    A request longer than the maximum request size is not read: it gets an
+    error response and its connection is closed.
+    """
+
+    def __init__(self, classifier, maxBatchSize = 64, maxWaitTime = 0.005, maxRequestSize = MAX_REQUEST_SIZE):
+        """
+        ClassificationServer default constructor.
+
+        @param classifier: the trained classifier to serve.
+        @param maxBatchSize: the maximum amount of requests by batch (default is
+        64).
+        @param maxWaitTime: the maximum time in seconds a request waits for the
+        batch to fill (default is 0.005).
+        @param maxRequestSize: the maximum length in bytes of the text of a
+        request (default is MAX_REQUEST_SIZE).
+        """
+        self._classifier = classifier
+        self._maxBatchSize = maxBatchSize
+        self._maxWaitTime = maxWaitTime
+        self._maxRequestSize = maxRequestSize
+
+        self._queue = None
+        self._server = None
+        self._batcher = None
+
+        # Statistics, with the latencies of the latest requests only
+        self._latencies = deque(maxlen = LATENCY_WINDOW_SIZE)
+        self._nbRequests = 0
+        self._nbFailedRequests = 0
+        self._nbRejectedRequests = 0
+        self._nbBatches = 0
+        self._firstRequestTime = None
+        self._lastResponseTime = None
+
+    async def start(self, host = '127.0.0.1', port = 0):
+        """
+        Start serving over TCP.
+
+        @param host: the host to listen on (default is '127.0.0.1').
+        @param port: the port to listen on, 0 to pick a free one (default is
+        0).
+        @rtype: tuple
+        @return: the address the server listens on.
+        """
+        self._startBatcher()
+        self._server = await asyncio.start_server(self._handleConnection, host, port)
+
+        return self._server.sockets[0].getsockname()
+
+    async def startUnix(self, path):
+        """
+        Start serving over a Unix socket.
+
+        @param path: the file path of the socket.
+        """
+        self._startBatcher()
+        self._server = await asyncio.start_unix_server(self._handleConnection, path)
+
+    async def serveForever(self):
+        """
+        Serve until the task is cancelled.
+        """
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        """
+        Stop serving and drop the pending requests.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+        if self._batcher is not None:
+            self._batcher.cancel()
+
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+
+        self._server = None
+        self._batcher = None
+
+    def getStats(self):
+        """
+        Get the statistics of the requests answered since the start, failed
+        ones included: latency from reception to response, over the last
+        LATENCY_WINDOW_SIZE requests, and throughput. Requests rejected for
+        their size are only counted apart.
+
+        @rtype: dict
+        @return: a dictionary with the keys 'nbRequests', 'nbFailedRequests',
+        'nbRejectedRequests', 'nbBatches', 'meanBatchSize', 'p50Latency' and
+        'p99Latency' (in seconds) and 'throughput' (requests by second).
+        """
+        nbRequests = self._nbRequests
+
+        if not nbRequests:
+            return {'nbRequests': 0, 'nbFailedRequests': 0, 'nbRejectedRequests': self._nbRejectedRequests, 'nbBatches': 0, 'meanBatchSize': None, 'p50Latency': None, 'p99Latency': None, 'throughput': None}
+
+        latencies = sorted(self._latencies)
+        nbLatencies = len(latencies)
+        elapsedTime = self._lastResponseTime - self._firstRequestTime
+
+        return {
+            'nbRequests': nbRequests,
+            'nbFailedRequests': self._nbFailedRequests,
+            'nbRejectedRequests': self._nbRejectedRequests,
+            'nbBatches': self._nbBatches,
+            'meanBatchSize': float(nbRequests) / self._nbBatches if self._nbBatches else None,
+            'p50Latency': latencies[(nbLatencies - 1) * 50 // 100],
+            'p99Latency': latencies[(nbLatencies - 1) * 99 // 100],
+            'throughput': nbRequests / elapsedTime if elapsedTime > 0 else None
+        }
+
+    def resetStats(self):
+        """
+        Reset the statistics of the requests.
+        """
+        self._latencies.clear()
+        self._nbRequests = 0
+        self._nbFailedRequests = 0
+        self._nbRejectedRequests = 0
+        self._nbBatches = 0
+        self._firstRequestTime = None
+        self._lastResponseTime = None
+
+    def _startBatcher(self):
+        """
+        Start the task building and classifying the batches.
+        """
+        if self._batcher is None:
+            self._queue = asyncio.Queue()
+            self._batcher = asyncio.get_running_loop().create_task(self._runBatcher())
+
+    async def _handleConnection(self, reader, writer):
+        """
+        Answer the requests of a connection, in order, until it is closed.
+
+        @param reader: the stream reader of the connection.
+        @param writer: the stream writer of the connection.
+        """
+        loop = asyncio.get_running_loop()
+
+        try:
+            while True:
+                try:
+                    length, = _FRAME_LENGTH.unpack(await reader.readexactly(_FRAME_LENGTH.size))
+
+                    # Too long, or flagged as an error: the text is not read
+                    if length > self._maxRequestSize:
+                        _writeFrame(writer, 'ValueError: request of {0} bytes over the maximum of {1} bytes'.format(length, self._maxRequestSize).encode('utf-8'), True)
+                        await writer.drain()
+                        self._nbRejectedRequests += 1
+                        break
+
+                    text = await reader.readexactly(length)
+                except asyncio.IncompleteReadError:
+                    break
+
+                receptionTime = time.perf_counter()
+
+                if self._firstRequestTime is None:
+                    self._firstRequestTime = receptionTime
+
+                response = loop.create_future()
+                await self._queue.put((text, response))
+
+                try:
+                    _writeFrame(writer, (await response).encode('utf-8'))
+                except Exception as exception:
+                    _writeFrame(writer, '{0}: {1}'.format(type(exception).__name__, exception).encode('utf-8'), True)
+                    self._nbFailedRequests += 1
+
+                await writer.drain()
+
+                self._lastResponseTime = time.perf_counter()
+                self._latencies.append(self._lastResponseTime - receptionTime)
+                self._nbRequests += 1
+        finally:
+            writer.close()
+
+    async def _runBatcher(self):
+        """
+        Build batches from the queued requests and classify them, one batch at a
+        time.
+        """
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._maxWaitTime
+
+            while len(batch) < self._maxBatchSize:
+                timeout = deadline - loop.time()
+
+                if timeout <= 0:
+                    break
+
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # A text which cannot be decoded fails alone
+            texts = []
+            responses = []
+
+            for text, response in batch:
+                try:
+                    texts.append(text.decode('utf-8'))
+                    responses.append(response)
+                except UnicodeDecodeError as exception:
+                    _setResponse(response, exception = exception)
+
+            if texts:
+                results = await loop.run_in_executor(None, self._classifyTexts, texts)
+
+                for response, (className, exception) in zip(responses, results):
+                    _setResponse(response, className, exception)
+
+            self._nbBatches += 1
+
+    def _classifyTexts(self, texts):
+        """
+        Classify decoded texts at once, in a worker thread. If the batch fails,
+        its texts are classified one by one, so that only the failing ones get
+        the error.
+
+        @param texts: the texts of the batch.
+        @rtype: list
+        @return: the (bayes class name, None) or (None, exception raised) of
+        every text, in order.
+        """
+        try:
+            return [(str(className), None) for className in self._classifier.classifyTexts(texts)]
+        except Exception:
+            pass
+
+        results = []
+
+        for text in texts:
+            try:
+                results.append((str(self._classifier.classifyText(text)), None))
+            except Exception as exception:
+                results.append((None, exception))
+
+        return results
+
+class ClassificationClient(object):
+    """
+    ClassificationClient objects send texts to a ClassificationServer over one
+    connection.
+    """
+
+    def __init__(self):
+        """
+        ClassificationClient default constructor.
+        """
+        self._reader = None
+        self._writer = None
+
+    async def connect(self, host, port):
+        """
+        Connect to a server over TCP.
+
+        @param host: the host of the server.
+        @param port: the port of the server.
+        """
+        self._reader, self._writer = await asyncio.open_connection(host, port)
+
+    async def connectUnix(self, path):
+        """
+        Connect to a server over a Unix socket.
+
+        @param path: the file path of the socket.
+        """
+        self._reader, self._writer = await asyncio.open_unix_connection(path)
+
+    async def classify(self, text):
+        """
+        Classify a text with the server.
+
+        @param text: the text to classify (str, or UTF-8 bytes).
+        @rtype: str
+        @return: the name of the most probable bayes class.
+        @raise ClassificationError: if the server could not classify the text.
+        """
+        if isinstance(text, str):
+            text = text.encode('utf-8')
+
+        _writeFrame(self._writer, text)
+        await self._writer.drain()
+
+        length, = _FRAME_LENGTH.unpack(await self._reader.readexactly(_FRAME_LENGTH.size))
+        response = (await self._reader.readexactly(length & ~_FRAME_ERROR)).decode('utf-8')
+
+        if length & _FRAME_ERROR:
+            raise ClassificationError(response)
+
+        return response
+
+    async def close(self):
+        """
+        Close the connection.
+        """
+        self._writer.close()
+        await self._writer.wait_closed()
+
+#------------------------------------------------------------------------------#
+#                                                                              #
+#                             UTILITIES FUNCTIONS                              #
+#                                                                              #
+#------------------------------------------------------------------------------#
+
+def _writeFrame(writer, payload, error = False):
+    """
+    Write a frame: the payload length followed by the payload.
+
+    @param writer: the stream writer.
+    @param payload: the bytes to write.
+    @param error: flag the frame as an error message if this argument is True
+    (default is False).
+    """
+    writer.write(_FRAME_LENGTH.pack(len(payload) | (_FRAME_ERROR if error else 0)) + payload)
+
+def _setResponse(response, className = None, exception = None):
+    """
+    Set the result or the exception of a response future, unless the request
+    was cancelled in the meantime.
+
+    @param response: the response future.
+    @param className: the name of the bayes class found (default is None).
+    @param exception: the exception raised by the classification, or None
+    (default is None).
+    """
+    if response.done():
+        return
+
+    if exception is not None:
+        response.set_exception(exception)
+    else:
+        response.set_result(className)
+
+#------------------------------------------------------------------------------#
+#                                                                              #
+# ------------------------------- MAIN SECTION ------------------------------- #
+#                                                                              #
+#------------------------------------------------------------------------------#
+
+# If this is the main module, run this
+if __name__ == '__main__':
+
+#------------------------------------------------------------------------------#
+#                                                                              #
+#                             UTILITIES FUNCTIONS                              #
+#                                                                              #
+#------------------------------------------------------------------------------#
+
+    async def serve(arguments):
+        print('  -> LOADING MODEL...', end = '')
+        classifier = BayesClassifier(useNumpy = arguments.numpy)
+        classifier.load(arguments.model)
+        print(' DONE')
+
+        server = ClassificationServer(classifier, arguments.max_batch_size, arguments.max_wait_time, arguments.max_request_size)
+
+        if arguments.unix:
+            await server.startUnix(arguments.unix)
+            print('  -> LISTENING ON {0}'.format(arguments.unix))
+        else:
+            address = await server.start(arguments.host, arguments.port)
+            print('  -> LISTENING ON {0}:{1}'.format(*address[:2]))
+
+        try:
+            await server.serveForever()
+        finally:
+            stats = server.getStats()
+
+            if stats['nbRequests']:
+                print('  -> REQUESTS: {0} IN {1} BATCHES'.format(stats['nbRequests'], stats['nbBatches']))
+                print('  -> LATENCY P50: {:.2f}ms, P99: {:.2f}ms'.format(stats['p50Latency'] * 1000, stats['p99Latency'] * 1000))
+
+#------------------------------------------------------------------------------#
+#                                                                              #
+#                                 INLINE CODE                                  #
+#                                                                              #
+#------------------------------------------------------------------------------#
+
+    parser = argparse.ArgumentParser(description = 'Serve a Bayes classifier model.')
+    parser.add_argument('model', help = 'model file written by BayesClassifier.save')
+    parser.add_argument('--host', default = '127.0.0.1')
+    parser.add_argument('--port', type = int, default = 8765)
+    parser.add_argument('--unix', help = 'Unix socket path, instead of TCP')
+    parser.add_argument('--max-batch-size', type = int, default = 64)
+    parser.add_argument('--max-wait-time', type = float, default = 0.005, help = 'in seconds')
+    parser.add_argument('--max-request-size', type = int, default = MAX_REQUEST_SIZE, help = 'in bytes')
+    parser.add_argument('--numpy', action = 'store_true', help = 'use the NumPy matrix scoring engine')
+
+    print('[SERVER STARTED]')
+
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+    print('[SERVER ENDED]')
@@ -0,0 +1,459 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+
+#------------------------------------------------------------------------------#
+# Tests of the Bayes classifier                                                #
+# ============================================================================ #
+# Organization: HE-Arc Engineering                                             #
+# Developer(s): Danick Fort                                                    #
+#               Dany Jupille                                                   #
+#                                                                              #
+# Filename:     test_classifier.py                                             #
+# Description:  Tests of the classifier and server modules, run with pytest.   #
+# Version:      1.0                                                            #
+#------------------------------------------------------------------------------#
+
+#------------------------------------------------------------------------------#
+#                                                                              #
+#                               LIBRARIES IMPORT                               #
+#                                                                              #
+#------------------------------------------------------------------------------#
+
+import asyncio
+import os
+import pickle
+import subprocess
+import sys
+import threading
+
+from array import array
+
+import pytest
+
+import classifier as classifierModule
+
+from collections import Counter
+
+from classifier import BayesClassifier, CorpusCache
+
+#------------------------------------------------------------------------------#
+#                                                                              #
+#                             UTILITIES FUNCTIONS                              #
+#                                                                              #
+#------------------------------------------------------------------------------#
+
+TRAINING_TEXTS = {
+    'positive': ['un film beau et drole', 'une histoire belle et drole', 'des acteurs justes et beaux'],
+    'negative': ['un film long et triste', 'une histoire lente et ennuyeuse', 'des acteurs faux et tristes']
+}
+
+TESTING_TEXTS = ['un film drole', 'une histoire triste et lente', 'des acteurs beaux', 'rien de connu']
+
+def createClassifier(**settings):
+    """
+    Create a classifier trained on TRAINING_TEXTS.
+
+    @param settings: the BayesClassifier constructor arguments.
+    @rtype: BayesClassifier
+    @return: the trained classifier.
+    """
+    classifier = BayesClassifier(**settings)
+
+    for className, texts in TRAINING_TEXTS.items():
+        for text in texts:
+            classifier.addTrainingWordsCount(className, classifier._countTextWords(text))
+
+    classifier.doTraining()
+
+    return classifier
+
+def getScores(classifier, key = 'logScores'):
+    """
+    Get the scores of TESTING_TEXTS.
+
+    @param classifier: the trained classifier.
+    @param key: the key of the scores in the predictScoresWords result
+    (default is 'logScores').
+    @rtype: list
+    @return: the scores of every text.
+    """
+    return [classifier.predictScoresWords(classifier._tokenizer.tokenize(text))[key] for text in TESTING_TEXTS]
+
+def assertScoresEqual(scores, expectedScores):
+    """
+    Assert that two lists of scores by class name are equal, up to rounding.
+    """
+    assert len(scores) == len(expectedScores)
+
+    for textScores, expectedTextScores in zip(scores, expectedScores):
+        assert textScores.keys() == expectedTextScores.keys()
+
+        for className, score in textScores.items():
+            assert score == pytest.approx(expectedTextScores[className], abs = 1e-9)
+
+def saveOlderVersion(classifier, filePath, version):
+    """
+    Save a classifier in an older version of the model file format, the way the
+    save method of that version wrote it.
+
+    @param classifier: the trained classifier, without pruning nor features.
+    @param filePath: the file path of the model file to write.
+    @param version: the version of the format, from 1 to 4.
+    """
+    words = classifier._vocabulary.getWords()
+    vocabularySize = len(words)
+    bayesClasses = classifier._bayesClasses
+
+    with open(filePath, 'wb') as file:
+        file.write(classifierModule._MODEL_HEADER.pack(classifierModule.MODEL_MAGIC, version, classifier._filesTagged, ord('d'), len(bayesClasses), vocabularySize, classifier._trainedVocabularySize))
+
+        for bayesClassName, bayesClass in bayesClasses.items():
+            changedWordIds = array('q', sorted(bayesClass.getChangedWordIds()))
+
+            classifierModule._writeModelBlock(file, bayesClassName.encode('utf-8'))
+
+            if version == 1:
+                file.write(classifierModule._MODEL_CLASS_VERSION1.pack(bayesClass.getNbWords(), bayesClass.getLogDenominator(), len(changedWordIds)))
+            else:
+                file.write(classifierModule._MODEL_CLASS.pack(bayesClass.getNbWords(), bayesClass.getNbDocuments(), bayesClass.getLogDenominator(), bayesClass.getLogPrior(), len(changedWordIds)))
+
+            classifierModule._writeModelArray(file, changedWordIds)
+
+        classifierModule._writeModelBlock(file, '\n'.join(words).encode('utf-8'))
+        classifierModule._writeModelBlock(file, '\n'.join(classifier.getStopwordIndex()).encode('utf-8'))
+
+        if version >= 3:
+            file.write(classifierModule._MODEL_LENGTH.pack(0))
+
+        if version >= 4:
+            file.write(classifierModule._MODEL_FEATURES.pack(1, False))
+
+        file.write(b'\x00' * (-file.tell() % 8))
+
+        for bayesClass in bayesClasses.values():
+            classifierModule._writeModelArray(file, classifierModule._resizeArray(array('q', bayesClass.getWordsCount()), vocabularySize))
+
+        for bayesClass in bayesClasses.values():
+            classifierModule._writeModelArray(file, classifierModule._resizeArray(array('d', bayesClass.getWordsLogNumerator()), vocabularySize))
+
+#------------------------------------------------------------------------------#
+#                                                                              #
+#                                 MODEL FILES                                  #
+#                                                                              #
+#------------------------------------------------------------------------------#
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_saveLoadRoundTrip(tmp_path, mmap):
+    classifier = createClassifier()
+    filePath = str(tmp_path / 'model.bin')
+    classifier.save(filePath)
+
+    loadedClassifier = BayesClassifier()
+    loadedClassifier.load(filePath, mmap)
+
+    assertScoresEqual(getScores(loadedClassifier), getScores(classifier))
+
+@pytest.mark.parametrize('version', [1, 2, 3, 4])
+def test_loadOlderVersion(tmp_path, version):
+    classifier = createClassifier()
+    filePath = str(tmp_path / 'model.bin')
+    saveOlderVersion(classifier, filePath, version)
+
+    loadedClassifier = BayesClassifier()
+    loadedClassifier.load(filePath)
+
+    # Files of version 1 have no documents, only the likelihoods are kept
+    assertScoresEqual(getScores(loadedClassifier, 'logLikelihoods'), getScores(classifier, 'logLikelihoods'))
+
+    if version > 1:
+        assertScoresEqual(getScores(loadedClassifier), getScores(classifier))
+
+    # Training again after loading gives the same model as training once
+    for trainedClassifier in (loadedClassifier, classifier):
+        trainedClassifier.addTrainingWordsCount('positive', trainedClassifier._countTextWords('un film nouveau et drole'))
+        trainedClassifier.doTraining()
+
+    assertScoresEqual(getScores(loadedClassifier, 'logLikelihoods'), getScores(classifier, 'logLikelihoods'))
+
+def test_saveOverMappedModel(tmp_path):
+    filePath = str(tmp_path / 'model.bin')
+    createClassifier().save(filePath)
+
+    # Run in a child process: a truncated mapping kills it with SIGBUS
+    script = '''
+import sys
+import threading
+from collections import Counter
+
+from classifier import BayesClassifier, CorpusCache
+
+filePath = sys.argv[1]
+reader = BayesClassifier()
+reader.load(filePath)
+writer = BayesClassifier()
+writer.load(filePath)
+scores = reader.predictScoresWords(['film', 'drole'])['logScores']
+
+writer.partialFit('positive', 'film drole')
+writer.save(filePath)
+writer.partialFit('negative', 'film triste')
+writer.save(filePath)
+
+assert reader.predictScoresWords(['film', 'drole'])['logScores'] == scores
+
+reloaded = BayesClassifier()
+reloaded.load(filePath)
+assert reloaded.predictScoresWords(['film', 'drole'])['logScores'] == writer.predictScoresWords(['film', 'drole'])['logScores']
+'''
+    result = subprocess.run([sys.executable, '-c', script, filePath], cwd = os.path.dirname(os.path.abspath(classifierModule.__file__)), capture_output = True, text = True)
+
+    assert result.returncode == 0, result.stderr
+    assert [path.name for path in tmp_path.iterdir()] == ['model.bin']
+
+#------------------------------------------------------------------------------#
+#                                                                              #
+#                                    SERVER                                    #
+#                                                                              #
+#------------------------------------------------------------------------------#
+
+def test_serverMalformedRequestInBatch():
+    from server import ClassificationClient, ClassificationError, ClassificationServer
+
+    async def run():
+        server = ClassificationServer(createClassifier(), maxBatchSize = 4, maxWaitTime = 0.5)
+        host, port = (await server.start())[:2]
+        clients = [ClassificationClient() for i in range(4)]
+
+        for client in clients:
+            await client.connect(host, port)
+
+        texts = ['un film drole', b'\xff\xfe invalide', 'une histoire triste', 'des acteurs beaux']
+        results = await asyncio.gather(*[client.classify(text) for client, text in zip(clients, texts)], return_exceptions = True)
+
+        # The connection of the malformed request is still usable
+        nextResult = await clients[1].classify('un film triste')
+
+        for client in clients:
+            await client.close()
+
+        stats = server.getStats()
+        await server.stop()
+
+        return results, nextResult, stats
+
+    results, nextResult, stats = asyncio.run(run())
+
+    assert results[0] == 'positive' and results[2] == 'negative' and results[3] == 'positive'
+    assert isinstance(results[1], ClassificationError) and 'UnicodeDecodeError' in str(results[1])
+    assert nextResult == 'negative'
+    assert stats['nbRequests'] == 5 and stats['nbFailedRequests'] == 1
+    assert stats['nbBatches'] == 2 and stats['meanBatchSize'] == 2.5
+
+def test_serverRequestTooLarge():
+    from server import _FRAME_ERROR, _FRAME_LENGTH, ClassificationClient, ClassificationError, ClassificationServer
+
+    async def run():
+        server = ClassificationServer(createClassifier(), maxRequestSize = 32)
+        host, port = (await server.start())[:2]
+        client = ClassificationClient()
+        await client.connect(host, port)
+
+        with pytest.raises(ClassificationError, match = 'maximum of 32 bytes'):
+            await client.classify('un film drole ' * 4)
+
+        # The connection is closed
+        with pytest.raises((asyncio.IncompleteReadError, ConnectionError)):
+            await client.classify('un film drole')
+
+        await client.close()
+
+        # A length flagged as an error is rejected the same way, unread
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(_FRAME_LENGTH.pack(_FRAME_ERROR | 4))
+        length, = _FRAME_LENGTH.unpack(await reader.readexactly(_FRAME_LENGTH.size))
+        await reader.readexactly(length & ~_FRAME_ERROR)
+        closed = await reader.read() == b''
+        writer.close()
+
+        # The server still answers other connections
+        await client.connect(host, port)
+        result = await client.classify('un film drole')
+        await client.close()
+
+        stats = server.getStats()
+        await server.stop()
+
+        return length, closed, result, stats
+
+    length, closed, result, stats = asyncio.run(run())
+
+    assert length & _FRAME_ERROR and closed
+    assert result == 'positive'
+    assert stats['nbRejectedRequests'] == 2 and stats['nbRequests'] == 1
+
+#------------------------------------------------------------------------------#
+#                                                                              #
+#                                 CORPUS CACHE                                 #
+#                                                                              #
+#------------------------------------------------------------------------------#
+
+def test_corpusCacheSharedDirectory(tmp_path):
+    # Two instances stand for two processes sharing the directory
+    firstCache = CorpusCache(str(tmp_path), maxSize = 2000)
+    secondCache = CorpusCache(str(tmp_path), maxSize = 2000)
+
+    firstCache.put('a', Counter(film = 1))
+    assert secondCache.get('a') == Counter(film = 1)
+    assert secondCache.getNbHits() == 1
+
+    for i in range(40):
+        (firstCache if i % 2 else secondCache).put('entry{0}'.format(i), Counter({'mot{0}'.format(j): j for j in range(10)}))
+
+    assert 0 < firstCache.getSize() <= 2000
+    assert secondCache.get('entry39') is not None
+    assert firstCache.get('entry0') is None
+
+#------------------------------------------------------------------------------#
+#                                                                              #
+#                                   TRAINING                                   #
+#                                                                              #
+#------------------------------------------------------------------------------#
+
+def test_incrementalPruningMatchesFullTraining():
+    classifier = createClassifier()
+    classifier.setPruning(minWordCount = 2)
+    classifier.doTraining()
+
+    for text in ['un film drole', 'une histoire nouvelle', 'des acteurs nouveaux et drole']:
+        classifier.partialFit('positive', text)
+
+    classifier.forget('positive', 'une histoire nouvelle')
+
+    fullClassifier = pickle.loads(pickle.dumps(classifier))
+    fullClassifier.doTraining(full = True)
+
+    assert classifier._prunedWordIds == fullClassifier._prunedWordIds
+    assertScoresEqual(getScores(classifier), getScores(fullClassifier))
+
+def test_forgottenWordsAreUnknown():
+    untouchedClassifier = createClassifier()
+    classifier = createClassifier()
+
+    for trainedClassifier in (untouchedClassifier, classifier):
+        trainedClassifier.setUnknownWordsPolicy(classifierModule.UNKNOWN_WORDS_LAPLACE)
+
+    classifier.partialFit('positive', 'zorglub')
+    classifier.forget('positive', 'zorglub')
+
+    for trainedClassifier in (untouchedClassifier, classifier):
+        trainedClassifier.resetNbUnknownWords()
+        trainedClassifier.predictScoresWords(['film', 'zorglub'])
+
+    assert classifier.getNbUnknownWords() == untouchedClassifier.getNbUnknownWords() == 1
+    assertScoresEqual(getScores(classifier), getScores(untouchedClassifier))
+
+def test_concurrentPartialFitAndClassify():
+    classifier = createClassifier()
+    expectedClassifier = createClassifier()
+    texts = ['un film nouveau et drole', 'une histoire longue', 'des acteurs nouveaux']
+    errors = []
+    writing = threading.Event()
+
+    def classify():
+        try:
+            while not writing.is_set():
+                for text in TESTING_TEXTS:
+                    assert classifier.classifyText(text) in TRAINING_TEXTS
+
+                assert all(className in TRAINING_TEXTS for className in classifier.classifyTexts(TESTING_TEXTS))
+        except Exception as exception:
+            errors.append(exception)
+
+    readers = [threading.Thread(target = classify) for i in range(4)]
+
+    for reader in readers:
+        reader.start()
+
+    for i in range(50):
+        for text in texts:
+            classifier.partialFit('positive', text)
+
+        classifier.forget('positive', texts[i % len(texts)])
+
+    writing.set()
+
+    for reader in readers:
+        reader.join()
+
+    for i in range(50):
+        for text in texts:
+            expectedClassifier.addTrainingWordsCount('positive', expectedClassifier._countTextWords(text))
+
+        expectedClassifier.removeTrainingWordsCount('positive', expectedClassifier._countTextWords(texts[i % len(texts)]))
+
+    expectedClassifier.doTraining(full = True)
+
+    assert not errors
+    assertScoresEqual(getScores(classifier), getScores(expectedClassifier))
+
+def test_incrementalPruningAfterEmptyTraining():
+    classifier = createClassifier()
+    classifier.setPruning(maxVocabularySize = 2)
+    classifier.doTraining()
+    classifier.emptyTraining()
+
+    classifier.addTrainingWordsCount('a', Counter(p = 1, q = 9, r = 9))
+    classifier.addTrainingWordsCount('b', Counter(q = 1, s = 1))
+    classifier.doTraining()
+
+    fullClassifier = pickle.loads(pickle.dumps(classifier))
+    fullClassifier.doTraining(full = True)
+
+    assert classifier._prunedWordIds == fullClassifier._prunedWordIds
+    assert classifier.predictScoresWords(['p', 'r'])['logScores'] == fullClassifier.predictScoresWords(['p', 'r'])['logScores']
+
+@pytest.mark.parametrize('stratified', [True, False])
+def test_crossValidationFoldsMixClasses(tmp_path, stratified):
+    filePathsByClass = {}
+
+    for className, texts in TRAINING_TEXTS.items():
+        filePathsByClass[className] = []
+
+        for i in range(4):
+            for j, text in enumerate(texts):
+                filePath = tmp_path / '{0}{1}{2}.txt'.format(className, i, j)
+                filePath.write_text(text, encoding = 'utf-8')
+                filePathsByClass[className].append(str(filePath))
+
+    folds = BayesClassifier().doCrossValidation(filePathsByClass, nbFolds = 2, stratified = stratified)
+
+    # Every fold trains and tests on both classes
+    for fold in folds:
+        assert all(accuracy is not None for accuracy in fold['classesAccuracy'].values())
+        assert fold['accuracy'] > 0.5
+
+def test_concurrentClassifyCounters():
+    classifier = createClassifier()
+    classifier.enableInstrumentation()
+    classifier.classifyText('rien de connu')
+
+    nbUnknownWords = classifier.getNbUnknownWords()
+    nbLookups = classifier.getStats()['counters']['nbLookups']
+    classifier.resetNbUnknownWords()
+    classifier.resetStats()
+
+    def classify():
+        for i in range(500):
+            classifier.classifyText('rien de connu')
+
+    readers = [threading.Thread(target = classify) for i in range(8)]
+
+    for reader in readers:
+        reader.start()
+
+    for reader in readers:
+        reader.join()
+
+    assert classifier.getNbUnknownWords() == 4000 * nbUnknownWords
+    assert classifier.getStats()['counters']['nbLookups'] == 4000 * nbLookups
+    assert classifier.getStats()['counters']['nbScorings'] == 4000